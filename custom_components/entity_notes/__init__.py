@@ -1,21 +1,24 @@
 """Entity Notes integration for Home Assistant."""
+import asyncio
 import logging
 import voluptuous as vol
 import time
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, SupportsResponse, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 from homeassistant.components.http import HomeAssistantView
-from homeassistant.helpers.storage import Store
-from homeassistant.components.frontend import add_extra_js_url
+from homeassistant.components.frontend import add_extra_js_url, remove_extra_js_url
 from aiohttp import web
+import hashlib
 import json
-import os
-from pathlib import Path
+import sys
 
 from .const import (
     DOMAIN,
-    STORAGE_VERSION,
     STORAGE_KEY,
     MAX_NOTE_LENGTH,
     CONF_DEBUG_LOGGING,
@@ -34,6 +37,16 @@ from .const import (
     CONF_HIDE_MARKDOWN_HINTS,
     CONF_EMPTY_NOTE_PLACEHOLDER,
     CONF_HIDE_LAST_MODIFIED,
+    CONF_SAVE_DELAY,
+    CONF_STORAGE_BACKEND,
+    CONF_RENDER_BUDGET,
+    CONF_ORPHAN_SWEEP_INTERVAL,
+    CONF_EVENT_MODE,
+    CONF_RECORD_EVENTS,
+    CONF_BACKGROUND_LOAD,
+    CONF_COMPRESS_NOTES,
+    CONF_BACKUP_INTERVAL,
+    CONF_BACKUP_RETENTION,
     DEFAULT_DEBUG_LOGGING,
     DEFAULT_MAX_NOTE_LENGTH,
     DEFAULT_AUTO_BACKUP,
@@ -45,25 +58,74 @@ from .const import (
     DEFAULT_ENABLE_DEVICE_NOTES,
     DEFAULT_CONFIRM_DELETE,
     DEFAULT_SHOW_MARKDOWN_TOOLBAR,
-    DEFAULT_HIDE_MARKDOWN_TOOLBAR,
     DEFAULT_HIDE_PREVIEW_BUTTON,
     DEFAULT_HIDE_MARKDOWN_HINTS,
     DEFAULT_EMPTY_NOTE_PLACEHOLDER,
     DEFAULT_HIDE_LAST_MODIFIED,
     FRONTEND_JS_PATH,
+    BATCH_MAX_IDS,
+    BATCH_STREAM_CHUNK,
+    BATCH_STREAM_THRESHOLD,
+    NOTE_FIELDS,
+    LIST_DEFAULT_LIMIT,
+    LIST_MAX_LIMIT,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    CHANGES_DEFAULT_LIMIT,
+    CHANGES_MAX_LIMIT,
+    DEFAULT_SAVE_DELAY,
+    DEFAULT_STORAGE_BACKEND,
+    DEFAULT_RENDER_BUDGET,
+    DEFAULT_ORPHAN_SWEEP_INTERVAL,
+    DEFAULT_EVENT_MODE,
+    DEFAULT_RECORD_EVENTS,
+    DEFAULT_BACKGROUND_LOAD,
+    DEFAULT_COMPRESS_NOTES,
+    DEFAULT_BACKUP_INTERVAL,
+    DEFAULT_BACKUP_RETENTION,
+    LEGACY_BACKUP_FILE,
+    NOTES_LOAD_TIMEOUT,
+    EVENT_MODE_SLIM,
+    ORPHAN_SWEEP_STARTUP_DELAY,
+    EVENT_ORPHANS_SWEPT,
+    SIGNAL_NOTE_CHANGED,
+    SIGNAL_NOTES_RELOADED,
     EVENT_NOTES_UPDATED,
     EVENT_DEVICE_NOTES_UPDATED,
+    EVENT_NOTES_BULK_UPDATED,
+    EVENT_DEVICE_NOTES_BULK_UPDATED,
     SERVICE_SET_NOTE,
     SERVICE_GET_NOTE,
     SERVICE_DELETE_NOTE,
     SERVICE_LIST_NOTES,
+    SERVICE_SET_NOTES,
+    SERVICE_DELETE_NOTES,
     SERVICE_BACKUP_NOTES,
     SERVICE_RESTORE_NOTES,
+    SERVICE_LIST_BACKUPS,
+    SERVICE_SWEEP_ORPHANS,
+    SERVICE_SEARCH,
+    SERVICE_QUERY,
     SERVICE_SET_DEVICE_NOTE,
     SERVICE_GET_DEVICE_NOTE,
     SERVICE_DELETE_DEVICE_NOTE,
     SERVICE_LIST_DEVICE_NOTES,
+    SERVICE_SET_DEVICE_NOTES,
+    SERVICE_DELETE_DEVICE_NOTES,
 )
+from .frontend import (
+    IMMUTABLE_CACHE_CONTROL,
+    JS_URL,
+    VERSIONED_JS_URL,
+    async_build_bundles,
+    versioned_url,
+)
+from .render import RenderCache, TemplateCache
+from .backups import NoteBackups
+from .changes import ChangeLog
+from .records import EMPTY_NOTE, load_notes, note_record
+from .search import NoteQueryIndex, NoteSearchIndex
+from .storage import create_notes_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -74,20 +136,36 @@ NOTE_TARGETS = {
         "store_key": "entity_notes",
         "id_field": "entity_id",
         "event": EVENT_NOTES_UPDATED,
+        "bulk_event": EVENT_NOTES_BULK_UPDATED,
         "get_response_event": "entity_notes_get_response",
         "list_response_event": "entity_notes_list_response",
         "set_service": "set_note",
+        "id_validator": cv.entity_id,
     },
     "device": {
         "store_key": "device_notes",
         "id_field": "device_id",
         "event": EVENT_DEVICE_NOTES_UPDATED,
+        "bulk_event": EVENT_DEVICE_NOTES_BULK_UPDATED,
         "get_response_event": "device_notes_get_response",
         "list_response_event": "device_notes_list_response",
         "set_service": "set_device_note",
+        "id_validator": cv.string,
     },
 }
 
+# Events kept out of the recorder when record_events is off
+RECORDER_EXCLUDED_EVENTS = {
+    event_type
+    for target in NOTE_TARGETS.values()
+    for event_type in (
+        target["event"],
+        target["bulk_event"],
+        target["get_response_event"],
+        target["list_response_event"],
+    )
+} | {EVENT_ORPHANS_SWEPT}
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Entity Notes integration from configuration.yaml."""
@@ -121,107 +199,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hide_markdown_hints = options.get(CONF_HIDE_MARKDOWN_HINTS, DEFAULT_HIDE_MARKDOWN_HINTS)
     empty_note_placeholder = options.get(CONF_EMPTY_NOTE_PLACEHOLDER, DEFAULT_EMPTY_NOTE_PLACEHOLDER)
     hide_last_modified = options.get(CONF_HIDE_LAST_MODIFIED, DEFAULT_HIDE_LAST_MODIFIED)
+    save_delay = options.get(CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY)
+    storage_backend = options.get(CONF_STORAGE_BACKEND, DEFAULT_STORAGE_BACKEND)
+    render_budget = options.get(CONF_RENDER_BUDGET, DEFAULT_RENDER_BUDGET)
+    orphan_sweep_interval = options.get(CONF_ORPHAN_SWEEP_INTERVAL, DEFAULT_ORPHAN_SWEEP_INTERVAL)
+    event_mode = options.get(CONF_EVENT_MODE, DEFAULT_EVENT_MODE)
+    record_events = options.get(CONF_RECORD_EVENTS, DEFAULT_RECORD_EVENTS)
+    background_load = options.get(CONF_BACKGROUND_LOAD, DEFAULT_BACKGROUND_LOAD)
+    compress_notes = options.get(CONF_COMPRESS_NOTES, DEFAULT_COMPRESS_NOTES)
+    backup_interval = options.get(CONF_BACKUP_INTERVAL, DEFAULT_BACKUP_INTERVAL)
+    backup_retention = options.get(CONF_BACKUP_RETENTION, DEFAULT_BACKUP_RETENTION)
 
     if debug_logging:
         _LOGGER.setLevel(logging.DEBUG)
         _LOGGER.debug("Debug logging enabled for Entity Notes")
 
     try:
-        # Check for v1 storage and migrate BEFORE creating Store
-        storage_path = Path(hass.config.path(".storage")) / STORAGE_KEY
-
-        if storage_path.exists():
-            try:
-                # Read file asynchronously using executor
-                def _read_storage():
-                    with open(storage_path, 'r') as f:
-                        return json.load(f)
-
-                file_data = await hass.async_add_executor_job(_read_storage)
-                file_version = file_data.get("version", 1)
-
-                if file_version == 1:
-                    _LOGGER.warning("=" * 80)
-                    _LOGGER.warning("MIGRATING Entity Notes from v1 to v2")
-                    _LOGGER.warning("Found storage version 1, upgrading to version 2")
-
-                    old_data = file_data.get("data", {})
-                    _LOGGER.warning("Found %d entity notes to migrate", len(old_data))
-
-                    # Create backup asynchronously
-                    try:
-                        backup_path = Path(hass.config.path(".storage")) / "entity_notes.notes.backup_v1"
-
-                        def _write_backup():
-                            with open(backup_path, 'w') as f:
-                                json.dump(file_data, f, indent=2)
-
-                        await hass.async_add_executor_job(_write_backup)
-                        _LOGGER.warning("Created backup at: %s", backup_path)
-                    except Exception as backup_error:
-                        _LOGGER.error("Failed to create backup: %s", backup_error)
-
-                    # Prepare migrated data in v2 format
-                    migrated_data = {
-                        "version": STORAGE_VERSION,
-                        "minor_version": 1,
-                        "key": STORAGE_KEY,
-                        "data": {
-                            "entity_notes": old_data.copy(),
-                            "device_notes": {}
-                        }
-                    }
-
-                    # Write migrated file asynchronously
-                    def _write_migrated():
-                        with open(storage_path, 'w') as f:
-                            json.dump(migrated_data, f, indent=2)
-
-                    await hass.async_add_executor_job(_write_migrated)
-
-                    _LOGGER.warning("Successfully migrated %d entity notes to v2", len(old_data))
-                    _LOGGER.warning("=" * 80)
-
-            except Exception as e:
-                _LOGGER.error("Error during migration: %s", e)
-                import traceback
-                _LOGGER.error("Traceback: %s", traceback.format_exc())
-
-        # Initialize storage (now v2 format if migration happened)
-        _LOGGER.debug("Initializing storage")
-        store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
-
-        # Load existing notes
-        try:
-            stored_data = await store.async_load()
-
-            # Extract entity and device notes from stored data
-            entity_notes_data = stored_data.get("entity_notes", {}) if stored_data else {}
-            device_notes_data = stored_data.get("device_notes", {}) if stored_data else {}
+        # Initialize storage; version 1 files are migrated by the store on load
+        _LOGGER.debug("Initializing %s storage", storage_backend)
+        store = create_notes_store(
+            hass,
+            storage_backend,
+            lambda: _notes_snapshot(hass),
+            lambda note_type, item_id: _notes_data(hass, note_type).get(item_id),
+            save_delay,
+        )
 
-            _LOGGER.info("Loaded %d entity notes and %d device notes",
-                         len(entity_notes_data), len(device_notes_data))
-        except Exception as e:
-            _LOGGER.error("=" * 80)
-            _LOGGER.error("EXCEPTION WHILE LOADING NOTES STORAGE")
-            _LOGGER.error("Error type: %s", type(e).__name__)
-            _LOGGER.error("Error message: %s", str(e))
-            import traceback
-            _LOGGER.error("Full traceback:\n%s", traceback.format_exc())
-            _LOGGER.error("=" * 80)
-            _LOGGER.error(
-                "Entity Notes setup aborted to avoid overwriting existing note storage. "
-                "Check .storage/%s before reloading the integration.",
-                STORAGE_KEY,
-            )
-            return False
+        template_cache = TemplateCache(hass)
+        render_cache = RenderCache(hass, template_cache, render_budget)
+        change_log = ChangeLog()
+        backups = NoteBackups(
+            hass,
+            lambda: _notes_snapshot(hass),
+            lambda note_type, item_id: _notes_data(hass, note_type).get(item_id),
+            change_log,
+            backup_retention,
+        )
 
-        # Store the configuration and data in hass.data
+        # Store the configuration and data in hass.data; the notes are filled
+        # in by _async_load_notes and notes_loaded resolves once they are
         hass.data.setdefault(DOMAIN, {})
         hass.data[DOMAIN] = {
             "store": store,
-            "entity_notes": entity_notes_data,
-            "device_notes": device_notes_data,
+            "template_cache": template_cache,
+            "render_cache": render_cache,
+            "search_index": NoteSearchIndex(),
+            "query_index": NoteQueryIndex(),
+            "change_log": change_log,
+            "backups": backups,
+            "entity_notes": {},
+            "device_notes": {},
+            "notes_loaded": hass.loop.create_future(),
+            "load_task": None,
             "config": {
                 CONF_DEBUG_LOGGING: debug_logging,
                 CONF_MAX_NOTE_LENGTH: max_note_length,
@@ -239,12 +268,44 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 CONF_HIDE_MARKDOWN_HINTS: hide_markdown_hints,
                 CONF_EMPTY_NOTE_PLACEHOLDER: empty_note_placeholder,
                 CONF_HIDE_LAST_MODIFIED: hide_last_modified,
+                CONF_SAVE_DELAY: save_delay,
+                CONF_STORAGE_BACKEND: storage_backend,
+                CONF_RENDER_BUDGET: render_budget,
+                CONF_ORPHAN_SWEEP_INTERVAL: orphan_sweep_interval,
+                CONF_EVENT_MODE: event_mode,
+                CONF_RECORD_EVENTS: record_events,
+                CONF_BACKGROUND_LOAD: background_load,
+                CONF_COMPRESS_NOTES: compress_notes,
+                CONF_BACKUP_INTERVAL: backup_interval,
+                CONF_BACKUP_RETENTION: backup_retention,
             },
             "entry_id": entry.entry_id,
             "entity_listener_remove": None,  # Will store the entity event listener removal callable
+            "entity_registry_listener_remove": None,  # Will store the entity registry listener removal callable
+            "orphan_sweep_remove": None,  # Will store the callable cancelling the scheduled orphan sweeps
+            "backup_remove": None,  # Will store the callable cancelling the scheduled backups
             "device_listener_remove": None,  # Will store the device event listener removal callable
         }
 
+        if background_load:
+            # Views and services are registered straight away and wait for
+            # the notes until they are loaded
+            hass.data[DOMAIN]["load_task"] = hass.async_create_background_task(
+                _async_load_notes(hass), "entity_notes load"
+            )
+        elif not await _async_load_notes(hass):
+            hass.data.pop(DOMAIN, None)
+            return False
+
+        render_cache.async_start()
+
+        # Build the frontend scripts once; an options change reloads the entry and rebuilds them
+        try:
+            hass.data[DOMAIN]["frontend_bundles"] = await async_build_bundles(hass, hass.data[DOMAIN]["config"])
+        except OSError as e:
+            _LOGGER.error("Failed to build the Entity Notes frontend scripts: %s", e)
+            hass.data[DOMAIN]["frontend_bundles"] = {}
+
         # Register the API views
         hass.http.register_view(EntityNotesView())
         _LOGGER.debug("EntityNotesView registered")
@@ -253,6 +314,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             hass.http.register_view(DeviceNotesView())
             _LOGGER.debug("DeviceNotesView registered")
 
+        hass.http.register_view(EntityNotesBatchView())
+        _LOGGER.debug("EntityNotesBatchView registered")
+
+        hass.http.register_view(EntityNotesSearchView())
+        _LOGGER.debug("EntityNotesSearchView registered")
+
+        hass.http.register_view(EntityNotesQueryView())
+        _LOGGER.debug("EntityNotesQueryView registered")
+
+        hass.http.register_view(EntityNotesChangesView())
+        _LOGGER.debug("EntityNotesChangesView registered")
+
         # Register the render view for Live Preview
         hass.http.register_view(EntityNotesRenderView())
         _LOGGER.debug("EntityNotesRenderView registered")
@@ -261,47 +334,136 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.http.register_view(EntityNotesJSView())
         _LOGGER.debug("EntityNotesJSView registered")
 
-        # Add JavaScript to frontend - SINGLE STATIC URL (no cache busting to prevent multiple versions)
-        js_url = "/api/entity_notes/entity-notes.js"
+        hass.http.register_view(EntityNotesVersionedJSView())
+        _LOGGER.debug("EntityNotesVersionedJSView registered")
+
+        # Add JavaScript to frontend under a content-hashed URL so browsers can cache it
+        # forever; new content or options produce a new URL on the next page load
+        bundle = hass.data[DOMAIN]["frontend_bundles"].get(FRONTEND_JS_PATH)
+        js_url = versioned_url(bundle, FRONTEND_JS_PATH) if bundle else JS_URL
         add_extra_js_url(hass, js_url)
+        hass.data[DOMAIN]["js_url"] = js_url
         _LOGGER.debug("Frontend resource registered: %s", js_url)
 
         # Register services
         await async_register_services(hass)
 
-        # Set up entity removal tracking if enabled
+        # Register websocket commands
+        from .websocket import async_register_websocket_commands
+
+        async_register_websocket_commands(hass)
+
+        if not record_events:
+            hass.data[DOMAIN]["recorder_excluded_events"] = _async_exclude_events_from_recorder(hass)
+            _LOGGER.debug("Entity Notes events excluded from the recorder")
+
+        # Track entity registry changes. Renames move the note to the new
+        # entity_id unless that already has a note; removals delete it if enabled. The event filters only pass
+        # events for entities that have a note, so ordinary registry updates and
+        # state changes never schedule a listener.
+        from homeassistant.helpers import entity_registry as er
+
+        notes_loaded = hass.data[DOMAIN]["notes_loaded"]
+        deferred_registry_events = []
+
+        @callback
+        def entity_registry_filter(event_data):
+            """Pass renames and removals of entities that have a note."""
+            if not notes_loaded.done():
+                # Which entities have a note is not known yet
+                return event_data["action"] == "remove" or "old_entity_id" in event_data
+            entity_notes_data = hass.data[DOMAIN]["entity_notes"]
+            if event_data["action"] == "update":
+                return event_data.get("old_entity_id") in entity_notes_data
+            return (
+                delete_notes_with_entity
+                and event_data["action"] == "remove"
+                and event_data["entity_id"] in entity_notes_data
+            )
+
+        @callback
+        def entity_registry_listener(event):
+            """Move the note of a renamed entity or delete the note of a removed one."""
+            # Runs synchronously so the note has moved before the old entity's
+            # state is removed and the state listener below could see it
+            if not notes_loaded.done():
+                deferred_registry_events.append(event)
+                return
+            entity_notes_data = hass.data[DOMAIN]["entity_notes"]
+            entity_id = event.data["entity_id"]
+
+            if event.data["action"] == "update":
+                old_entity_id = event.data["old_entity_id"]
+                if entity_id in entity_notes_data:
+                    # Keep both notes; the old one stays under the old entity_id
+                    _LOGGER.warning(
+                        "Keeping the note of renamed entity %s under its old ID because %s already has a note",
+                        old_entity_id,
+                        entity_id,
+                    )
+                    return
+                note = entity_notes_data.pop(old_entity_id)
+                entity_notes_data[sys.intern(entity_id)] = note
+                # The note text is still in use, so keep its compiled template
+                _async_note_changed(hass, "entity", old_entity_id, None)
+                _async_note_changed(hass, "entity", entity_id, None)
+                changes = [("entity", old_entity_id), ("entity", entity_id)]
+
+                _async_fire_note_updated(hass, "entity", old_entity_id, "")
+                _async_fire_note_updated(hass, "entity", entity_id, note.text, note.updated_at)
+                _LOGGER.info("Moved note for renamed entity %s to %s", old_entity_id, entity_id)
+            else:
+                old_note = entity_notes_data.pop(entity_id)
+                _async_note_changed(hass, "entity", entity_id, old_note)
+                changes = [("entity", entity_id)]
+
+                _async_fire_note_updated(hass, "entity", entity_id, "")
+                _LOGGER.info("Deleted note for removed entity: %s", entity_id)
+
+            hass.async_create_task(_save_notes(hass, changes), eager_start=True)
+
+        @callback
+        def replay_registry_events(_loaded):
+            """Apply the registry changes made while the notes were loading."""
+            while deferred_registry_events:
+                event = deferred_registry_events.pop(0)
+                if entity_registry_filter(event.data):
+                    entity_registry_listener(event)
+
+        hass.data[DOMAIN]["entity_registry_listener_remove"] = hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            entity_registry_listener,
+            event_filter=entity_registry_filter,
+        )
+        if not notes_loaded.done():
+            notes_loaded.add_done_callback(replay_registry_events)
+        _LOGGER.debug("Entity rename tracking enabled")
+
+        # Entities without a registry entry (such as YAML entities without a
+        # unique_id) only disappear from the state machine
         if delete_notes_with_entity:
+            entity_registry = er.async_get(hass)
+
+            @callback
+            def entity_removed_filter(event_data):
+                """Pass state removals of noted entities the entity registry does not know."""
+                return (
+                    event_data["new_state"] is None
+                    and event_data["entity_id"] in hass.data[DOMAIN]["entity_notes"]
+                    and entity_registry.async_get(event_data["entity_id"]) is None
+                )
+
             async def entity_removed_listener(event):
                 """Handle entity removal events."""
-                entity_id = event.data.get("entity_id")
-                old_state = event.data.get("old_state")
-                new_state = event.data.get("new_state")
-
-                # Entity was removed if new_state is None and old_state existed
-                if new_state is None and old_state is not None and entity_id:
-                    entity_notes_data = hass.data[DOMAIN]["entity_notes"]
-
-                    # Check if we have a note for this entity
-                    if entity_id in entity_notes_data:
-                        store = hass.data[DOMAIN]["store"]
-                        del entity_notes_data[entity_id]
-
-                        # Save both entity and device notes
-                        await store.async_save({
-                            "entity_notes": entity_notes_data,
-                            "device_notes": hass.data[DOMAIN]["device_notes"]
-                        })
-
-                        # Fire event
-                        hass.bus.async_fire(EVENT_NOTES_UPDATED, {"entity_id": entity_id, "note": ""})
-
-                        if debug_logging:
-                            _LOGGER.debug("Deleted note for removed entity: %s", entity_id)
-                        else:
-                            _LOGGER.info("Deleted note for removed entity: %s", entity_id)
-
-            # Listen for state_changed events and store the removal callable
-            entity_listener_remove = hass.bus.async_listen("state_changed", entity_removed_listener)
+                entity_id = event.data["entity_id"]
+                if await _delete_note(hass, "entity", entity_id, log_changes=False):
+                    _LOGGER.info("Deleted note for removed entity: %s", entity_id)
+
+            entity_listener_remove = hass.bus.async_listen(
+                "state_changed",
+                entity_removed_listener,
+                event_filter=entity_removed_filter,
+            )
             hass.data[DOMAIN]["entity_listener_remove"] = entity_listener_remove
             _LOGGER.debug("Entity removal tracking enabled")
 
@@ -309,38 +471,94 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if enable_device_notes and delete_notes_with_device:
             from homeassistant.helpers import device_registry as dr
 
+            @callback
+            def device_removed_filter(event_data):
+                """Pass removals of devices that have a note."""
+                return (
+                    event_data["action"] == "remove"
+                    and event_data["device_id"] in hass.data[DOMAIN]["device_notes"]
+                )
+
             async def device_removed_listener(event):
                 """Handle device removal events."""
-                if event.data.get("action") == "remove":
-                    device_id = event.data.get("device_id")
-
-                    if device_id:
-                        device_notes_data = hass.data[DOMAIN]["device_notes"]
-
-                        # Check if we have a note for this device
-                        if device_id in device_notes_data:
-                            store = hass.data[DOMAIN]["store"]
-                            del device_notes_data[device_id]
-
-                            # Save both entity and device notes
-                            await store.async_save({
-                                "entity_notes": hass.data[DOMAIN]["entity_notes"],
-                                "device_notes": device_notes_data
-                            })
-
-                            # Fire event
-                            hass.bus.async_fire(EVENT_DEVICE_NOTES_UPDATED, {"device_id": device_id, "note": ""})
-
-                            if debug_logging:
-                                _LOGGER.debug("Deleted note for removed device: %s", device_id)
-                            else:
-                                _LOGGER.info("Deleted note for removed device: %s", device_id)
+                device_id = event.data["device_id"]
+                if await _delete_note(hass, "device", device_id, log_changes=False):
+                    _LOGGER.info("Deleted note for removed device: %s", device_id)
 
             # Listen for device registry events
-            device_listener_remove = hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, device_removed_listener)
+            device_listener_remove = hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                device_removed_listener,
+                event_filter=device_removed_filter,
+            )
             hass.data[DOMAIN]["device_listener_remove"] = device_listener_remove
             _LOGGER.debug("Device removal tracking enabled")
 
+        # Periodically sweep notes of entities and devices that were removed
+        # while Home Assistant was down or without a removal event
+        sweep_note_types = []
+        if delete_notes_with_entity:
+            sweep_note_types.append("entity")
+        if enable_device_notes and delete_notes_with_device:
+            sweep_note_types.append("device")
+
+        if orphan_sweep_interval and sweep_note_types:
+            from datetime import timedelta
+            from homeassistant.helpers.event import async_call_later, async_track_time_interval
+            from homeassistant.helpers.start import async_at_started
+
+            sweep_unsubs = []
+
+            async def periodic_orphan_sweep(_now):
+                """Sweep orphaned notes on a schedule."""
+                if await _async_notes_ready(hass):
+                    await _async_sweep_orphans(hass, sweep_note_types)
+
+            @callback
+            def start_orphan_sweep(_hass):
+                """Schedule the sweeps once all integrations have had time to add their entities."""
+                # The start listener has fired and removed itself
+                sweep_unsubs.clear()
+                sweep_unsubs.append(async_call_later(hass, ORPHAN_SWEEP_STARTUP_DELAY, periodic_orphan_sweep))
+                sweep_unsubs.append(
+                    async_track_time_interval(hass, periodic_orphan_sweep, timedelta(hours=orphan_sweep_interval))
+                )
+
+            sweep_unsubs.append(async_at_started(hass, start_orphan_sweep))
+
+            @callback
+            def stop_orphan_sweep():
+                """Cancel the scheduled sweeps."""
+                while sweep_unsubs:
+                    sweep_unsubs.pop()()
+
+            hass.data[DOMAIN]["orphan_sweep_remove"] = stop_orphan_sweep
+            _LOGGER.debug("Orphan sweep scheduled every %d hours", orphan_sweep_interval)
+
+        # Back up the notes on a schedule: a delta when only some notes
+        # changed, a full snapshot once a day or when the changes are unknown
+        if auto_backup:
+            from datetime import timedelta
+            from homeassistant.helpers.event import async_track_time_interval
+
+            async def periodic_backup(_now):
+                """Back up the notes on a schedule."""
+                if not await _async_notes_ready(hass):
+                    return
+                try:
+                    await backups.async_backup()
+                except OSError as e:
+                    _LOGGER.error("Failed to back up notes: %s", e)
+
+            hass.data[DOMAIN]["backup_remove"] = async_track_time_interval(
+                hass, periodic_backup, timedelta(hours=backup_interval)
+            )
+            _LOGGER.debug("Automatic backups scheduled every %d hours", backup_interval)
+
+        # Reload once changed options are saved, so the frontend bundle and its
+        # URL hash are rebuilt from the new options
+        entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+
         _LOGGER.info("Entity Notes integration setup completed successfully")
         return True
 
@@ -349,6 +567,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the integration to apply changed options."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.info("Unloading Entity Notes integration")
@@ -356,26 +579,66 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     try:
         # Remove event listeners if they exist
         if DOMAIN in hass.data:
+            if hass.data[DOMAIN].get("load_task"):
+                hass.data[DOMAIN]["load_task"].cancel()
+            if not hass.data[DOMAIN]["notes_loaded"].done():
+                hass.data[DOMAIN]["notes_loaded"].set_result(False)
+
             if hass.data[DOMAIN].get("entity_listener_remove"):
                 hass.data[DOMAIN]["entity_listener_remove"]()
                 _LOGGER.debug("Entity removal listener removed")
 
+            if hass.data[DOMAIN].get("entity_registry_listener_remove"):
+                hass.data[DOMAIN]["entity_registry_listener_remove"]()
+                _LOGGER.debug("Entity registry listener removed")
+
+            if hass.data[DOMAIN].get("orphan_sweep_remove"):
+                hass.data[DOMAIN]["orphan_sweep_remove"]()
+                _LOGGER.debug("Orphan sweep cancelled")
+
+            if hass.data[DOMAIN].get("backup_remove"):
+                hass.data[DOMAIN]["backup_remove"]()
+                _LOGGER.debug("Automatic backups cancelled")
+
             if hass.data[DOMAIN].get("device_listener_remove"):
                 hass.data[DOMAIN]["device_listener_remove"]()
                 _LOGGER.debug("Device removal listener removed")
 
+            hass.data[DOMAIN]["render_cache"].async_stop()
+
+            if hass.data[DOMAIN].get("recorder_excluded_events"):
+                from homeassistant.components.recorder import get_instance
+
+                get_instance(hass).exclude_event_types.difference_update(
+                    hass.data[DOMAIN]["recorder_excluded_events"]
+                )
+
+            if hass.data[DOMAIN].get("js_url"):
+                remove_extra_js_url(hass, hass.data[DOMAIN]["js_url"])
+
+            # Write any coalesced changes before the in-memory notes go away
+            await hass.data[DOMAIN]["store"].async_close()
+
         # Remove services
         services_to_remove = [
             SERVICE_SET_NOTE,
             SERVICE_GET_NOTE,
             SERVICE_DELETE_NOTE,
             SERVICE_LIST_NOTES,
+            SERVICE_SET_NOTES,
+            SERVICE_DELETE_NOTES,
             SERVICE_BACKUP_NOTES,
             SERVICE_RESTORE_NOTES,
+            SERVICE_LIST_BACKUPS,
+            SERVICE_SWEEP_ORPHANS,
+            SERVICE_SEARCH,
+            SERVICE_QUERY,
             SERVICE_SET_DEVICE_NOTE,
             SERVICE_GET_DEVICE_NOTE,
             SERVICE_DELETE_DEVICE_NOTE,
             SERVICE_LIST_DEVICE_NOTES,
+            SERVICE_SET_DEVICE_NOTES,
+            SERVICE_DELETE_DEVICE_NOTES,
         ]
 
         for service in services_to_remove:
@@ -410,22 +673,205 @@ def _note_log_target(note_type, item_id):
     return item_id
 
 
-def _note_text_and_updated(raw_note):
-    """Normalize old string notes and current dict notes."""
-    if isinstance(raw_note, dict):
-        return raw_note.get("text", ""), raw_note.get("updated_at")
-    return raw_note, None
+def _notes_snapshot(hass: HomeAssistant):
+    """Return a copy of the entity and device notes for persisting.
 
+    The records are shared with the live notes; Home Assistant's JSON encoder
+    writes them in their stored form.
+    """
+    return {
+        "entity_notes": dict(hass.data[DOMAIN]["entity_notes"]),
+        "device_notes": dict(hass.data[DOMAIN]["device_notes"]),
+    }
 
-async def _save_notes(hass: HomeAssistant) -> None:
-    """Persist entity and device notes together."""
-    await hass.data[DOMAIN]["store"].async_save({
-        "entity_notes": hass.data[DOMAIN]["entity_notes"],
-        "device_notes": hass.data[DOMAIN]["device_notes"],
-    })
 
+async def _save_notes(hass: HomeAssistant, changes=None) -> None:
+    """Persist note changes.
+
+    ``changes`` lists the (note_type, item_id) pairs that changed so the journal
+    backend can append just those; ``None`` persists everything.
+    """
+    await hass.data[DOMAIN]["store"].async_save(changes)
+
+
+async def _async_load_notes(hass: HomeAssistant) -> bool:
+    """Load the stored notes and build the indexes over them.
+
+    Resolves the notes_loaded future either way; returns False if the notes
+    could not be loaded.
+    """
+    loaded = hass.data[DOMAIN]["notes_loaded"]
+    try:
+        load_start = time.perf_counter()
+        stored_data = await hass.data[DOMAIN]["store"].async_load()
+        load_ms = (time.perf_counter() - load_start) * 1000
+    except Exception as e:
+        _LOGGER.error("=" * 80)
+        _LOGGER.error("EXCEPTION WHILE LOADING NOTES STORAGE")
+        _LOGGER.error("Error type: %s", type(e).__name__)
+        _LOGGER.error("Error message: %s", str(e))
+        import traceback
+        _LOGGER.error("Full traceback:\n%s", traceback.format_exc())
+        _LOGGER.error("=" * 80)
+        _LOGGER.error(
+            "Entity Notes setup aborted to avoid overwriting existing note storage. "
+            "Check .storage/%s before reloading the integration.",
+            STORAGE_KEY,
+        )
+        loaded.set_result(False)
+        return False
+
+    # Extract entity and device notes from stored data and normalize them into
+    # records once, off the event loop; long notes are (de)compressed to match
+    # the compress_notes option
+    stored_data = stored_data or {}
+    compress = hass.data[DOMAIN]["config"][CONF_COMPRESS_NOTES]
+    for store_key in ("entity_notes", "device_notes"):
+        hass.data[DOMAIN][store_key] = await hass.async_add_executor_job(
+            load_notes, stored_data.get(store_key, {}), compress
+        )
+    _LOGGER.info("Loaded %d entity notes and %d device notes in %.1f ms",
+                 len(hass.data[DOMAIN]["entity_notes"]), len(hass.data[DOMAIN]["device_notes"]), load_ms)
+
+    # Index the notes for search off the event loop, which includes reading
+    # compressed notes; nothing can change them until notes_loaded resolves
+    await hass.async_add_executor_job(lambda: hass.data[DOMAIN]["search_index"].rebuild(_note_texts(hass)))
+    hass.data[DOMAIN]["query_index"].rebuild(_note_times(hass))
+
+    try:
+        await hass.data[DOMAIN]["backups"].async_load()
+    except OSError as e:
+        _LOGGER.error("Failed to list note backups: %s", e)
+    loaded.set_result(True)
+    return True
 
-def _render_note(hass: HomeAssistant, note_type, item_id, note, user_name):
+
+async def _async_notes_ready(hass: HomeAssistant) -> bool:
+    """Wait for notes still loading in the background.
+
+    Returns False if they failed to load or are not loaded within
+    NOTES_LOAD_TIMEOUT seconds.
+    """
+    loaded = hass.data[DOMAIN]["notes_loaded"]
+    if loaded.done():
+        return loaded.result()
+    try:
+        async with asyncio.timeout(NOTES_LOAD_TIMEOUT):
+            # Shielded so a timed out request does not cancel the future for everyone
+            return await asyncio.shield(loaded)
+    except TimeoutError:
+        _LOGGER.warning("Timed out after %d seconds waiting for Entity Notes to load", NOTES_LOAD_TIMEOUT)
+        return False
+
+
+def _notes_unavailable_response():
+    """Return the response for requests made while the notes are unavailable."""
+    return web.json_response(
+        {"error": "Entity Notes could not load its notes"},
+        status=503,
+        headers={"Retry-After": "5"},
+    )
+
+
+def _note_texts(hass: HomeAssistant):
+    """Return (note_type, item_id, text) for every note."""
+    return [
+        (note_type, item_id, record.text)
+        for note_type in NOTE_TARGETS
+        for item_id, record in _notes_data(hass, note_type).items()
+    ]
+
+
+def _note_times(hass: HomeAssistant):
+    """Return (note_type, item_id, updated_at) for every note."""
+    return [
+        (note_type, item_id, record.updated_at)
+        for note_type in NOTE_TARGETS
+        for item_id, record in _notes_data(hass, note_type).items()
+    ]
+
+
+@callback
+def _async_note_changed(hass: HomeAssistant, note_type, item_id, old_note) -> None:
+    """Update in-memory caches and indexes after a note was set or removed."""
+    hass.data[DOMAIN]["render_cache"].async_invalidate_note(note_type, item_id)
+    if old_note is not None:
+        hass.data[DOMAIN]["template_cache"].async_invalidate(old_note.text)
+
+    record = _notes_data(hass, note_type).get(item_id)
+    hass.data[DOMAIN]["search_index"].update(note_type, item_id, (record or EMPTY_NOTE).text)
+    hass.data[DOMAIN]["query_index"].update(
+        note_type, item_id, record is not None, (record or EMPTY_NOTE).updated_at
+    )
+    hass.data[DOMAIN]["change_log"].async_record(note_type, item_id)
+    async_dispatcher_send(hass, SIGNAL_NOTE_CHANGED, note_type, item_id)
+
+
+@callback
+def _async_notes_reloaded(hass: HomeAssistant) -> None:
+    """Reset in-memory caches and indexes after notes were replaced in bulk."""
+    hass.data[DOMAIN]["template_cache"].async_clear()
+    hass.data[DOMAIN]["render_cache"].async_clear()
+    hass.data[DOMAIN]["search_index"].rebuild(_note_texts(hass))
+    hass.data[DOMAIN]["query_index"].rebuild(_note_times(hass))
+    hass.data[DOMAIN]["change_log"].async_reset()
+    async_dispatcher_send(hass, SIGNAL_NOTES_RELOADED)
+
+
+def _timestamp(value):
+    """Return a datetime or epoch seconds as epoch seconds."""
+    if value is None or isinstance(value, int):
+        return value
+    return int(dt_util.as_timestamp(value))
+
+
+@callback
+def _async_query_notes(hass: HomeAssistant, params):
+    """Return one page of notes by id prefix, domain or update time."""
+    note_type = params["note_type"]
+    prefix = params["prefix"]
+    if params.get("domain"):
+        prefix = f"{params['domain']}.{prefix}"
+
+    offset = params["offset"]
+    limit = params["limit"]
+    item_ids, total = hass.data[DOMAIN]["query_index"].query(
+        note_type,
+        prefix,
+        _timestamp(params.get("updated_since")),
+        _timestamp(params.get("updated_before")),
+        offset,
+        limit,
+    )
+    notes_data = _notes_data(hass, note_type)
+    return {
+        "notes": [
+            _note_response(note_type, item_id, notes_data[item_id], params["fields"])
+            for item_id in item_ids
+        ],
+        "total": total,
+        "offset": offset,
+        "next_offset": offset + limit if offset + limit < total else None,
+    }
+
+
+@callback
+def _async_search_notes(hass: HomeAssistant, query, note_types=None, limit=SEARCH_DEFAULT_LIMIT, prefix=True):
+    """Search the notes and return the ranked matches with their text."""
+    results = []
+    for (note_type, item_id), score in hass.data[DOMAIN]["search_index"].search(query, note_types, limit, prefix):
+        record = _notes_data(hass, note_type).get(item_id, EMPTY_NOTE)
+        results.append({
+            "note_type": note_type,
+            _note_target(note_type)["id_field"]: item_id,
+            "note": record.text,
+            "updated_at": record.updated_at,
+            "score": round(score, 4),
+        })
+    return results
+
+
+async def _async_render_note(hass: HomeAssistant, note_type, item_id, note, user_name):
     """Render a note as a Home Assistant template."""
     rendered_note = note
     if not note:
@@ -433,10 +879,10 @@ def _render_note(hass: HomeAssistant, note_type, item_id, note, user_name):
 
     target = _note_target(note_type)
     try:
-        from homeassistant.helpers.template import Template
-        tpl = Template(note, hass)
         variables = {target["id_field"]: item_id, "user": user_name}
-        rendered_note = str(tpl.async_render(variables, parse_result=False))
+        rendered_note = await hass.data[DOMAIN]["render_cache"].async_render(
+            (note_type, item_id, user_name), note, variables
+        )
     except Exception as e:
         if note_type == "device":
             _LOGGER.warning("Failed to render template for device %s: %s", item_id, e)
@@ -446,6 +892,142 @@ def _render_note(hass: HomeAssistant, note_type, item_id, note, user_name):
     return rendered_note
 
 
+async def _async_note_payload(hass: HomeAssistant, note_type, item_id, user_name=None):
+    """Return a note as served by the REST API.
+
+    The note is rendered for ``user_name``; without one the rendered text is
+    left out.
+    """
+    record = _notes_data(hass, note_type).get(item_id, EMPTY_NOTE)
+    payload = {"note": record.text, "updated_at": record.updated_at}
+    if user_name is not None:
+        payload["rendered_note"] = await _async_render_note(hass, note_type, item_id, record.text, user_name)
+    return payload
+
+
+async def _async_note_change_payload(hass: HomeAssistant, note_type, item_id, user_name=None):
+    """Return a changed note as sent to syncing clients, with a tombstone for deleted notes."""
+    if item_id not in _notes_data(hass, note_type):
+        return {"note": "", "updated_at": None, "deleted": True}
+    return await _async_note_payload(hass, note_type, item_id, user_name)
+
+
+@callback
+def _async_find_orphans(hass: HomeAssistant, note_types):
+    """Return the ids of notes whose entity or device no longer exists.
+
+    An entity note is orphaned when the entity is neither in the entity
+    registry nor in the state machine, so entities without a unique_id are
+    kept while they have a state.
+    """
+    from homeassistant.helpers import device_registry as dr
+    from homeassistant.helpers import entity_registry as er
+
+    orphans = {}
+    if "entity" in note_types:
+        entity_registry = er.async_get(hass)
+        orphans["entity"] = [
+            entity_id
+            for entity_id in _notes_data(hass, "entity")
+            if entity_registry.async_get(entity_id) is None and hass.states.get(entity_id) is None
+        ]
+    if "device" in note_types:
+        device_registry = dr.async_get(hass)
+        orphans["device"] = [
+            device_id
+            for device_id in _notes_data(hass, "device")
+            if device_registry.async_get(device_id) is None
+        ]
+    return orphans
+
+
+async def _async_sweep_orphans(hass: HomeAssistant, note_types, dry_run=False):
+    """Delete the notes of vanished entities and devices in one batch.
+
+    All orphans are removed with a single persist and reported in a single
+    summary event instead of one save and one update event per note.
+    """
+    orphans = _async_find_orphans(hass, note_types)
+    changes = []
+    if not dry_run:
+        for note_type, item_ids in orphans.items():
+            notes_data = _notes_data(hass, note_type)
+            for item_id in item_ids:
+                old_note = notes_data.pop(item_id)
+                _async_note_changed(hass, note_type, item_id, old_note)
+                changes.append((note_type, item_id))
+        if changes:
+            await _save_notes(hass, changes)
+
+    summary = {
+        "dry_run": dry_run,
+        "entity_ids": orphans.get("entity", []),
+        "device_ids": orphans.get("device", []),
+    }
+    hass.bus.async_fire(EVENT_ORPHANS_SWEPT, summary)
+    _LOGGER.info(
+        "%s %d entity notes and %d device notes of removed entities and devices",
+        "Found" if dry_run else "Deleted",
+        len(summary["entity_ids"]),
+        len(summary["device_ids"]),
+    )
+    return summary
+
+
+def _note_response(note_type, item_id, record, fields):
+    """Return a note as a service response with only the selected fields."""
+    values = {"note": record.text, "updated_at": record.updated_at}
+    return {
+        _note_target(note_type)["id_field"]: item_id,
+        **{field: values[field] for field in fields},
+    }
+
+
+def _note_hash(note_text):
+    """Return a short content hash of note text, or None for no note."""
+    if not note_text:
+        return None
+    return hashlib.sha256(note_text.encode("utf-8")).hexdigest()[:16]
+
+
+@callback
+def _async_fire_note_updated(hass: HomeAssistant, note_type, item_id, note_text, updated_at=None):
+    """Fire the update event for a note in the configured event mode.
+
+    Slim events leave out the note text so edits do not put note contents
+    into the recorder; consumers fetch the text through the API instead.
+    """
+    target = _note_target(note_type)
+    if hass.data[DOMAIN]["config"][CONF_EVENT_MODE] == EVENT_MODE_SLIM:
+        event_data = {
+            target["id_field"]: item_id,
+            "change": "set" if note_text else "deleted",
+            "updated_at": updated_at,
+            "hash": _note_hash(note_text),
+        }
+    else:
+        event_data = {target["id_field"]: item_id, "note": note_text}
+    hass.bus.async_fire(target["event"], event_data)
+
+
+@callback
+def _async_exclude_events_from_recorder(hass: HomeAssistant):
+    """Stop the recorder from storing Entity Notes events.
+
+    Returns the event types that were added to the recorder's exclusions so
+    they can be handed back on unload.
+    """
+    if "recorder" not in hass.config.components:
+        return set()
+
+    from homeassistant.components.recorder import get_instance
+
+    exclude_event_types = get_instance(hass).exclude_event_types
+    excluded = RECORDER_EXCLUDED_EVENTS - exclude_event_types
+    exclude_event_types.update(excluded)
+    return excluded
+
+
 def _log_note_change(hass: HomeAssistant, log_changes, message, *args) -> None:
     """Log service changes at info level and REST changes only in debug mode."""
     if log_changes:
@@ -454,56 +1036,214 @@ def _log_note_change(hass: HomeAssistant, log_changes, message, *args) -> None:
         _LOGGER.debug(message, *args)
 
 
+def _normalize_note(note, max_length):
+    """Return note text as stored and whether it had to be truncated."""
+    note = str(note or "")
+    return note[:max_length].strip(), len(note) > max_length
+
+
+@callback
+def _async_apply_note(hass: HomeAssistant, note_type, item_id, note_text, updated_at):
+    """Store or remove a normalized note in memory and update the caches."""
+    notes_data = _notes_data(hass, note_type)
+    old_note = notes_data.get(item_id)
+    if note_text:
+        notes_data[sys.intern(item_id)] = note_record(
+            note_text, updated_at, hass.data[DOMAIN]["config"][CONF_COMPRESS_NOTES]
+        )
+    else:
+        notes_data.pop(item_id, None)
+    _async_note_changed(hass, note_type, item_id, old_note)
+
+
 async def _set_note(hass: HomeAssistant, note_type, item_id, note, log_changes=True):
     """Set or remove a note and return its saved state."""
-    target = _note_target(note_type)
-    notes_data = _notes_data(hass, note_type)
     max_length = hass.data[DOMAIN]["config"][CONF_MAX_NOTE_LENGTH]
-    note = str(note or "")
+    note_text, truncated = _normalize_note(note, max_length)
 
-    if len(note) > max_length:
-        note = note[:max_length]
+    if truncated:
         _LOGGER.warning(
             "Note truncated to %d characters for %s",
             max_length,
             _note_log_target(note_type, item_id),
         )
 
-    note_text = note.strip()
     updated_at = None
     if note_text:
         updated_at = int(time.time())
-        notes_data[item_id] = {
-            "text": note_text,
-            "updated_at": updated_at,
-        }
         _log_note_change(hass, log_changes, "Set note for %s", _note_log_target(note_type, item_id))
     else:
-        notes_data.pop(item_id, None)
         _log_note_change(hass, log_changes, "Removed note for %s", _note_log_target(note_type, item_id))
 
-    await _save_notes(hass)
-    hass.bus.async_fire(target["event"], {target["id_field"]: item_id, "note": note_text})
+    _async_apply_note(hass, note_type, item_id, note_text, updated_at)
+    await _save_notes(hass, [(note_type, item_id)])
+    _async_fire_note_updated(hass, note_type, item_id, note_text, updated_at)
     return note_text, updated_at
 
 
+async def _set_notes(hass: HomeAssistant, note_type, notes):
+    """Set or remove many notes with one persist and one bulk event.
+
+    Notes whose text does not change are skipped. Returns the changed ids.
+    """
+    target = _note_target(note_type)
+    notes_data = _notes_data(hass, note_type)
+    max_length = hass.data[DOMAIN]["config"][CONF_MAX_NOTE_LENGTH]
+    updated_at = int(time.time())
+    truncated = []
+    changed = []
+
+    for item_id, note in notes.items():
+        note_text, was_truncated = _normalize_note(note, max_length)
+        if was_truncated:
+            truncated.append(item_id)
+        if note_text == notes_data.get(item_id, EMPTY_NOTE).text:
+            continue
+        _async_apply_note(hass, note_type, item_id, note_text, updated_at if note_text else None)
+        changed.append(item_id)
+
+    if truncated:
+        _LOGGER.warning(
+            "Truncated %d notes to %d characters: %s",
+            len(truncated),
+            max_length,
+            ", ".join(_note_log_target(note_type, item_id) for item_id in truncated),
+        )
+
+    if changed:
+        await _save_notes(hass, [(note_type, item_id) for item_id in changed])
+        hass.bus.async_fire(target["bulk_event"], {f"{target['id_field']}s": changed})
+    _LOGGER.info("Set %d of %d %s notes", len(changed), len(notes), note_type)
+    return changed
+
+
 async def _delete_note(hass: HomeAssistant, note_type, item_id, log_changes=True):
     """Delete a note if it exists."""
-    target = _note_target(note_type)
     notes_data = _notes_data(hass, note_type)
     if item_id not in notes_data:
         return False
 
-    del notes_data[item_id]
-    await _save_notes(hass)
-    hass.bus.async_fire(target["event"], {target["id_field"]: item_id, "note": ""})
+    old_note = notes_data.pop(item_id)
+    _async_note_changed(hass, note_type, item_id, old_note)
+    await _save_notes(hass, [(note_type, item_id)])
+    _async_fire_note_updated(hass, note_type, item_id, "")
     _log_note_change(hass, log_changes, "Deleted note for %s", _note_log_target(note_type, item_id))
     return True
 
 
+async def _delete_notes(hass: HomeAssistant, note_type, item_ids):
+    """Delete many notes with one persist and one bulk event. Returns the deleted ids."""
+    target = _note_target(note_type)
+    notes_data = _notes_data(hass, note_type)
+    deleted = []
+
+    for item_id in dict.fromkeys(item_ids):
+        if item_id not in notes_data:
+            continue
+        old_note = notes_data.pop(item_id)
+        _async_note_changed(hass, note_type, item_id, old_note)
+        deleted.append(item_id)
+
+    if deleted:
+        await _save_notes(hass, [(note_type, item_id) for item_id in deleted])
+        hass.bus.async_fire(target["bulk_event"], {f"{target['id_field']}s": deleted})
+    _LOGGER.info("Deleted %d %s notes", len(deleted), note_type)
+    return deleted
+
+
+def _get_note_schema(note_type):
+    """Return the schema of a get service."""
+    target = _note_target(note_type)
+    return vol.Schema({
+        vol.Required(target["id_field"]): target["id_validator"],
+        vol.Optional("fields", default=NOTE_FIELDS): vol.All(cv.ensure_list, [vol.In(NOTE_FIELDS)]),
+    })
+
+
+def _list_notes_schema():
+    """Return the schema of a list service."""
+    return vol.Schema({
+        vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional("limit", default=LIST_DEFAULT_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=LIST_MAX_LIMIT)
+        ),
+        vol.Optional("fields", default=NOTE_FIELDS): vol.All(cv.ensure_list, [vol.In(NOTE_FIELDS)]),
+    })
+
+
+SWEEP_ORPHANS_SCHEMA = vol.Schema({
+    vol.Optional("dry_run", default=False): cv.boolean,
+})
+
+
+SEARCH_SCHEMA = vol.Schema({
+    vol.Required("query"): cv.string,
+    vol.Optional("note_type"): vol.In(list(NOTE_TARGETS)),
+    vol.Optional("limit", default=SEARCH_DEFAULT_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=SEARCH_MAX_LIMIT)
+    ),
+    vol.Optional("prefix", default=True): cv.boolean,
+})
+
+
+QUERY_SCHEMA = vol.Schema({
+    vol.Optional("note_type", default="entity"): vol.In(list(NOTE_TARGETS)),
+    vol.Optional("prefix", default=""): cv.string,
+    vol.Optional("domain"): cv.string,
+    vol.Optional("updated_since"): vol.Any(vol.Coerce(int), cv.datetime),
+    vol.Optional("updated_before"): vol.Any(vol.Coerce(int), cv.datetime),
+    vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional("limit", default=LIST_DEFAULT_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=LIST_MAX_LIMIT)
+    ),
+    vol.Optional("fields", default=NOTE_FIELDS): vol.All(cv.ensure_list, [vol.In(NOTE_FIELDS)]),
+})
+
+
+RESTORE_NOTES_SCHEMA = vol.Schema({
+    vol.Exclusive("backup", "restore_point"): cv.string,
+    vol.Exclusive("at", "restore_point"): vol.Any(vol.Coerce(int), cv.datetime),
+    vol.Optional("replace", default=False): cv.boolean,
+})
+
+
+def _set_notes_schema(note_type):
+    """Return the schema of a bulk set service."""
+    target = _note_target(note_type)
+    validate_id = target["id_validator"]
+    return vol.All(
+        vol.Schema({
+            vol.Optional("notes"): {validate_id: vol.Any(cv.string, None)},
+            # A list of ids needs a note for them; deleting is left to delete_notes
+            vol.Inclusive(target["id_field"], "shared_note"): vol.All(cv.ensure_list, [validate_id]),
+            vol.Inclusive("note", "shared_note"): vol.All(cv.string, vol.Length(min=1)),
+        }),
+        cv.has_at_least_one_key("notes", target["id_field"]),
+    )
+
+
+def _delete_notes_schema(note_type):
+    """Return the schema of a bulk delete service."""
+    target = _note_target(note_type)
+    return vol.Schema({
+        vol.Required(target["id_field"]): vol.All(cv.ensure_list, [target["id_validator"]]),
+    })
+
+
 async def async_register_services(hass: HomeAssistant) -> None:
     """Register the Entity Notes services."""
 
+    def wait_for_notes(handler):
+        """Make a service handler wait for notes still loading in the background."""
+
+        async def wait_and_handle(*args):
+            if not await _async_notes_ready(hass):
+                raise HomeAssistantError("Entity Notes could not load its notes")
+            return await handler(*args)
+
+        return wait_and_handle
+
+    @wait_for_notes
     async def handle_set_note_service(call, note_type):
         """Set a note for an entity or device."""
         target = _note_target(note_type)
@@ -514,20 +1254,27 @@ async def async_register_services(hass: HomeAssistant) -> None:
 
         await _set_note(hass, note_type, item_id, call.data.get("note", ""))
 
+    @wait_for_notes
     async def handle_get_note_service(call, note_type):
-        """Get a note for an entity or device."""
+        """Get a note for an entity or device.
+
+        The note is returned as a service response when one is requested, and
+        otherwise fired as a response event.
+        """
         target = _note_target(note_type)
-        item_id = call.data.get(target["id_field"])
-        if not item_id:
-            return
+        item_id = call.data[target["id_field"]]
+        record = _notes_data(hass, note_type).get(item_id, EMPTY_NOTE)
+
+        if call.return_response:
+            return _note_response(note_type, item_id, record, call.data["fields"])
 
-        raw_note = _notes_data(hass, note_type).get(item_id, "")
-        note, _updated_at = _note_text_and_updated(raw_note)
         hass.bus.async_fire(target["get_response_event"], {
             target["id_field"]: item_id,
-            "note": note,
+            "note": record.text,
         })
+        return None
 
+    @wait_for_notes
     async def handle_delete_note_service(call, note_type):
         """Delete a note for an entity or device."""
         target = _note_target(note_type)
@@ -537,12 +1284,54 @@ async def async_register_services(hass: HomeAssistant) -> None:
 
         await _delete_note(hass, note_type, item_id)
 
+    @wait_for_notes
     async def handle_list_notes_service(call, note_type):
-        """List all notes for a note type."""
+        """List the notes for a note type.
+
+        A service response returns one page of notes ordered by id. Without a
+        response all notes are fired in a single response event.
+        """
         target = _note_target(note_type)
+        notes_data = _notes_data(hass, note_type)
+
+        if call.return_response:
+            offset = call.data["offset"]
+            limit = call.data["limit"]
+            # The query index keeps the ids sorted, so a page is a slice
+            page, total = hass.data[DOMAIN]["query_index"].query(note_type, offset=offset, limit=limit)
+            next_offset = offset + limit
+            return {
+                "notes": [
+                    _note_response(note_type, item_id, notes_data[item_id], call.data["fields"])
+                    for item_id in page
+                ],
+                "total": total,
+                "offset": offset,
+                "next_offset": next_offset if next_offset < total else None,
+            }
+
         hass.bus.async_fire(target["list_response_event"], {
-            "notes": dict(_notes_data(hass, note_type)),
+            "notes": {
+                item_id: {"text": record.text, "updated_at": record.updated_at}
+                for item_id, record in notes_data.items()
+            },
         })
+        return None
+
+    @wait_for_notes
+    async def handle_set_notes_service(call, note_type):
+        """Set many notes for entities or devices at once."""
+        target = _note_target(note_type)
+        # One shared note for a list of ids, overridden per id by the mapping
+        notes = dict.fromkeys(call.data.get(target["id_field"], []), call.data.get("note"))
+        notes.update(call.data.get("notes", {}))
+        await _set_notes(hass, note_type, notes)
+
+    @wait_for_notes
+    async def handle_delete_notes_service(call, note_type):
+        """Delete many notes for entities or devices at once."""
+        target = _note_target(note_type)
+        await _delete_notes(hass, note_type, call.data[target["id_field"]])
 
     async def set_note_service(call):
         """Set a note for an entity."""
@@ -550,7 +1339,7 @@ async def async_register_services(hass: HomeAssistant) -> None:
 
     async def get_note_service(call):
         """Get a note for an entity."""
-        await handle_get_note_service(call, "entity")
+        return await handle_get_note_service(call, "entity")
 
     async def delete_note_service(call):
         """Delete a note for an entity."""
@@ -558,57 +1347,124 @@ async def async_register_services(hass: HomeAssistant) -> None:
 
     async def list_notes_service(call):
         """List all entity notes."""
-        await handle_list_notes_service(call, "entity")
+        return await handle_list_notes_service(call, "entity")
 
-    async def backup_notes_service(call):
-        """Backup all notes to a file."""
-        entity_notes_data = hass.data[DOMAIN]["entity_notes"]
-        device_notes_data = hass.data[DOMAIN]["device_notes"]
-        backup_path = hass.config.path("entity_notes_backup.json")
+    async def set_notes_service(call):
+        """Set notes for many entities."""
+        await handle_set_notes_service(call, "entity")
+
+    async def delete_notes_service(call):
+        """Delete the notes of many entities."""
+        await handle_delete_notes_service(call, "entity")
 
+    @wait_for_notes
+    async def backup_notes_service(call):
+        """Write a full snapshot of the notes to the backup directory."""
         try:
-            # Use async_add_executor_job to avoid blocking the event loop
-            def write_backup():
-                with open(backup_path, "w") as f:
-                    json.dump({
-                        "entity_notes": entity_notes_data,
-                        "device_notes": device_notes_data
-                    }, f, indent=2)
-
-            await hass.async_add_executor_job(write_backup)
-            _LOGGER.info("Notes backed up to %s", backup_path)
-        except Exception as e:
+            backup = await hass.data[DOMAIN]["backups"].async_backup(full=True)
+        except OSError as e:
             _LOGGER.error("Failed to backup notes: %s", e)
+            raise HomeAssistantError(f"Failed to backup notes: {e}") from e
+        _LOGGER.info("Notes backed up to %s", backup.name)
+        return {"backup": backup.name} if call.return_response else None
 
-    async def restore_notes_service(call):
-        """Restore notes from a backup file."""
-        backup_path = hass.config.path("entity_notes_backup.json")
+    async def read_legacy_backup():
+        """Return the notes of the single backup file written by older versions."""
+        backup_path = hass.config.path(LEGACY_BACKUP_FILE)
 
-        try:
-            # Use async_add_executor_job to avoid blocking the event loop
-            def read_backup():
-                with open(backup_path, "r") as f:
-                    return json.load(f)
+        def read_backup():
+            with open(backup_path, "r") as f:
+                backup_data = json.load(f)
+            # Handle both old and new backup formats
+            if "entity_notes" not in backup_data:
+                # Old format - assume all are entity notes
+                backup_data = {"entity_notes": backup_data}
+            return {
+                store_key: backup_data.get(store_key, {})
+                for store_key in ("entity_notes", "device_notes")
+            }
 
-            backup_data = await hass.async_add_executor_job(read_backup)
+        return await hass.async_add_executor_job(read_backup)
 
-            store = hass.data[DOMAIN]["store"]
+    @wait_for_notes
+    async def restore_notes_service(call):
+        """Restore notes from a backup, by name, by point in time or the latest one."""
+        backups = hass.data[DOMAIN]["backups"]
+        compress = hass.data[DOMAIN]["config"][CONF_COMPRESS_NOTES]
+        at = _timestamp(call.data.get("at"))
+        if "backup" in call.data:
+            if (selected := backups.find(call.data["backup"])) is None:
+                raise HomeAssistantError(f"No note backup named {call.data['backup']}")
+            at = selected.created_at
 
-            # Handle both old and new backup formats
-            if "entity_notes" in backup_data:
-                hass.data[DOMAIN]["entity_notes"].update(backup_data.get("entity_notes", {}))
-                hass.data[DOMAIN]["device_notes"].update(backup_data.get("device_notes", {}))
+        try:
+            if at is None and not backups.backups:
+                source, deltas = LEGACY_BACKUP_FILE, 0
+                backup_data = await read_legacy_backup()
             else:
-                # Old format - assume all are entity notes
-                hass.data[DOMAIN]["entity_notes"].update(backup_data)
-
-            await store.async_save({
-                "entity_notes": hass.data[DOMAIN]["entity_notes"],
-                "device_notes": hass.data[DOMAIN]["device_notes"]
-            })
-            _LOGGER.info("Notes restored from %s", backup_path)
-        except Exception as e:
+                snapshot, deltas, backup_data = await backups.async_read(at)
+                source = snapshot.name
+            backup_data = await hass.async_add_executor_job(
+                lambda: {store_key: load_notes(raw_notes, compress) for store_key, raw_notes in backup_data.items()}
+            )
+        except LookupError as e:
+            raise HomeAssistantError(str(e)) from e
+        except (OSError, ValueError) as e:
             _LOGGER.error("Failed to restore notes: %s", e)
+            raise HomeAssistantError(f"Failed to restore notes: {e}") from e
+
+        for store_key, notes in backup_data.items():
+            if call.data["replace"]:
+                hass.data[DOMAIN][store_key].clear()
+            hass.data[DOMAIN][store_key].update(notes)
+
+        _async_notes_reloaded(hass)
+        await _save_notes(hass)
+        _LOGGER.info("Notes restored from %s and %d later changes", source, deltas)
+        if not call.return_response:
+            return None
+        return {
+            "backup": source,
+            "deltas": deltas,
+            **{store_key: len(notes) for store_key, notes in backup_data.items()},
+        }
+
+    @wait_for_notes
+    async def list_backups_service(call):
+        """List the automatic note backups, oldest first."""
+        return {"backups": [backup.as_dict() for backup in hass.data[DOMAIN]["backups"].backups]}
+
+    @wait_for_notes
+    async def sweep_orphans_service(call):
+        """Delete or report the notes of removed entities and devices."""
+        if not hass.is_running:
+            # Integrations that have not loaded yet would look like removed entities
+            raise HomeAssistantError("Not sweeping orphaned notes before Home Assistant has started")
+
+        note_types = ["entity"]
+        if hass.data[DOMAIN]["config"][CONF_ENABLE_DEVICE_NOTES]:
+            note_types.append("device")
+        summary = await _async_sweep_orphans(hass, note_types, call.data["dry_run"])
+        return summary if call.return_response else None
+
+    @wait_for_notes
+    async def search_service(call):
+        """Search the notes."""
+        note_type = call.data.get("note_type")
+        return {
+            "results": _async_search_notes(
+                hass,
+                call.data["query"],
+                [note_type] if note_type else None,
+                call.data["limit"],
+                call.data["prefix"],
+            ),
+        }
+
+    @wait_for_notes
+    async def query_service(call):
+        """Query the notes by id prefix, domain or update time."""
+        return _async_query_notes(hass, call.data)
 
     async def set_device_note_service(call):
         """Set a note for a device."""
@@ -616,7 +1472,7 @@ async def async_register_services(hass: HomeAssistant) -> None:
 
     async def get_device_note_service(call):
         """Get a note for a device."""
-        await handle_get_note_service(call, "device")
+        return await handle_get_note_service(call, "device")
 
     async def delete_device_note_service(call):
         """Delete a note for a device."""
@@ -624,21 +1480,99 @@ async def async_register_services(hass: HomeAssistant) -> None:
 
     async def list_device_notes_service(call):
         """List all device notes."""
-        await handle_list_notes_service(call, "device")
+        return await handle_list_notes_service(call, "device")
+
+    async def set_device_notes_service(call):
+        """Set notes for many devices."""
+        await handle_set_notes_service(call, "device")
+
+    async def delete_device_notes_service(call):
+        """Delete the notes of many devices."""
+        await handle_delete_notes_service(call, "device")
 
     # Register entity services
     hass.services.async_register(DOMAIN, SERVICE_SET_NOTE, set_note_service)
-    hass.services.async_register(DOMAIN, SERVICE_GET_NOTE, get_note_service)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_NOTE,
+        get_note_service,
+        schema=_get_note_schema("entity"),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     hass.services.async_register(DOMAIN, SERVICE_DELETE_NOTE, delete_note_service)
-    hass.services.async_register(DOMAIN, SERVICE_LIST_NOTES, list_notes_service)
-    hass.services.async_register(DOMAIN, SERVICE_BACKUP_NOTES, backup_notes_service)
-    hass.services.async_register(DOMAIN, SERVICE_RESTORE_NOTES, restore_notes_service)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LIST_NOTES,
+        list_notes_service,
+        schema=_list_notes_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_SET_NOTES, set_notes_service, schema=_set_notes_schema("entity"))
+    hass.services.async_register(DOMAIN, SERVICE_DELETE_NOTES, delete_notes_service, schema=_delete_notes_schema("entity"))
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKUP_NOTES,
+        backup_notes_service,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTORE_NOTES,
+        restore_notes_service,
+        schema=RESTORE_NOTES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LIST_BACKUPS,
+        list_backups_service,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEARCH,
+        search_service,
+        schema=SEARCH_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY,
+        query_service,
+        schema=QUERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SWEEP_ORPHANS,
+        sweep_orphans_service,
+        schema=SWEEP_ORPHANS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
 
     # Register device services
     hass.services.async_register(DOMAIN, SERVICE_SET_DEVICE_NOTE, set_device_note_service)
-    hass.services.async_register(DOMAIN, SERVICE_GET_DEVICE_NOTE, get_device_note_service)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_DEVICE_NOTE,
+        get_device_note_service,
+        schema=_get_note_schema("device"),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     hass.services.async_register(DOMAIN, SERVICE_DELETE_DEVICE_NOTE, delete_device_note_service)
-    hass.services.async_register(DOMAIN, SERVICE_LIST_DEVICE_NOTES, list_device_notes_service)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LIST_DEVICE_NOTES,
+        list_device_notes_service,
+        schema=_list_notes_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_DEVICE_NOTES, set_device_notes_service, schema=_set_notes_schema("device")
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_DELETE_DEVICE_NOTES, delete_device_notes_service, schema=_delete_notes_schema("device")
+    )
 
 
 class NotesView(HomeAssistantView):
@@ -650,31 +1584,35 @@ class NotesView(HomeAssistantView):
     async def _get(self, request, item_id):
         """Get a note."""
         hass = request.app["hass"]
-        raw_note = _notes_data(hass, self.note_type).get(item_id, "")
-        note_text, updated_at = _note_text_and_updated(raw_note)
-
+        if not await _async_notes_ready(hass):
+            return _notes_unavailable_response()
         user_name = request.query.get("user") or (
             request.get("hass_user").name if request.get("hass_user") else "User"
         )
-        rendered_note = _render_note(hass, self.note_type, item_id, note_text, user_name)
+        payload = await _async_note_payload(hass, self.note_type, item_id, user_name)
 
         debug_logging = hass.data[DOMAIN]["config"][CONF_DEBUG_LOGGING]
         if debug_logging:
+            note_text = payload["note"]
             _LOGGER.debug(
                 "Retrieved note for %s: %s",
                 _note_log_target(self.note_type, item_id),
                 note_text[:50] + "..." if len(note_text) > 50 else note_text,
             )
 
-        return web.json_response({
-            "note": note_text,
-            "rendered_note": rendered_note,
-            "updated_at": updated_at,
-        })
+        # Rendered output can change while the note itself does not, so the
+        # ETag covers both the update time and the rendered text
+        etag = f'"{payload["updated_at"] or 0}-{_note_hash(payload["rendered_note"]) or 0}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+        return web.json_response(payload, headers=headers)
 
     async def _post(self, request, item_id):
         """Save a note."""
         hass = request.app["hass"]
+        if not await _async_notes_ready(hass):
+            return _notes_unavailable_response()
 
         try:
             data = await request.json()
@@ -688,7 +1626,7 @@ class NotesView(HomeAssistantView):
             user_name = data.get("user_name") or (
                 request.get("hass_user").name if request.get("hass_user") else "User"
             )
-            rendered_note = _render_note(hass, self.note_type, item_id, note, user_name)
+            rendered_note = await _async_render_note(hass, self.note_type, item_id, note, user_name)
 
             return web.json_response({
                 "status": "success",
@@ -703,6 +1641,8 @@ class NotesView(HomeAssistantView):
     async def _delete(self, request, item_id):
         """Delete a note."""
         hass = request.app["hass"]
+        if not await _async_notes_ready(hass):
+            return _notes_unavailable_response()
 
         try:
             if await _delete_note(hass, self.note_type, item_id, log_changes=False):
@@ -754,6 +1694,196 @@ class DeviceNotesView(NotesView):
         return await self._delete(request, device_id)
 
 
+class EntityNotesBatchView(HomeAssistantView):
+    """Return the notes for many entities and devices in one request."""
+
+    url = "/api/entity_notes/batch"
+    name = "api:entity_notes_batch"
+    requires_auth = True
+
+    async def post(self, request):
+        """Get the notes for lists of entity and device ids."""
+        hass = request.app["hass"]
+        if not await _async_notes_ready(hass):
+            return _notes_unavailable_response()
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.json_response({"error": "Invalid JSON"}, status=400)
+        if not isinstance(data, dict):
+            return web.json_response({"error": "Expected a JSON object"}, status=400)
+
+        requested = {}
+        for note_type, target in NOTE_TARGETS.items():
+            field = f"{target['id_field']}s"
+            item_ids = data.get(field) or []
+            if not isinstance(item_ids, list) or not all(isinstance(item_id, str) for item_id in item_ids):
+                return web.json_response({"error": f"{field} must be a list of strings"}, status=400)
+            if note_type == "device" and not hass.data[DOMAIN]["config"][CONF_ENABLE_DEVICE_NOTES]:
+                item_ids = []
+            # Drop duplicates but keep the requested order
+            requested[note_type] = list(dict.fromkeys(item_ids))
+
+        total = sum(len(item_ids) for item_ids in requested.values())
+        if total > BATCH_MAX_IDS:
+            return web.json_response(
+                {"error": f"At most {BATCH_MAX_IDS} ids can be requested at once"}, status=400
+            )
+
+        user_name = None
+        if data.get("render", True):
+            user_name = data.get("user_name") or (
+                request.get("hass_user").name if request.get("hass_user") else "User"
+            )
+
+        if total > BATCH_STREAM_THRESHOLD:
+            return await self._stream(request, hass, requested, user_name)
+
+        result = {}
+        for note_type, item_ids in requested.items():
+            result[_note_target(note_type)["store_key"]] = {
+                item_id: await _async_note_payload(hass, note_type, item_id, user_name)
+                for item_id in item_ids
+            }
+        return web.json_response(result)
+
+    async def _stream(self, request, hass, requested, user_name):
+        """Write a large batch as it is rendered instead of building it in memory."""
+        response = web.StreamResponse()
+        response.content_type = "application/json"
+        await response.prepare(request)
+
+        parts = ["{"]
+        pending = 0  # notes in parts
+        for index, (note_type, item_ids) in enumerate(requested.items()):
+            if index:
+                parts.append(",")
+            parts.append(f"{json.dumps(_note_target(note_type)['store_key'])}:{{")
+            for position, item_id in enumerate(item_ids):
+                payload = await _async_note_payload(hass, note_type, item_id, user_name)
+                if position:
+                    parts.append(",")
+                parts.append(f"{json.dumps(item_id)}:{json.dumps(payload)}")
+                pending += 1
+                if pending >= BATCH_STREAM_CHUNK:
+                    await response.write("".join(parts).encode("utf-8"))
+                    parts = []
+                    pending = 0
+            parts.append("}")
+        parts.append("}")
+        await response.write("".join(parts).encode("utf-8"))
+        await response.write_eof()
+        return response
+
+
+class EntityNotesSearchView(HomeAssistantView):
+    """Search the notes."""
+
+    url = "/api/entity_notes/search"
+    name = "api:entity_notes_search"
+    requires_auth = True
+
+    async def get(self, request):
+        """Return the notes matching the q query parameter."""
+        hass = request.app["hass"]
+        if not await _async_notes_ready(hass):
+            return _notes_unavailable_response()
+        try:
+            params = SEARCH_SCHEMA({
+                "query": request.query.get("q", ""),
+                **{
+                    key: request.query[key]
+                    for key in ("note_type", "limit", "prefix")
+                    if key in request.query
+                },
+            })
+        except vol.Invalid as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        note_type = params.get("note_type")
+        return web.json_response({
+            "results": _async_search_notes(
+                hass,
+                params["query"],
+                [note_type] if note_type else None,
+                params["limit"],
+                params["prefix"],
+            ),
+        })
+
+
+class EntityNotesQueryView(HomeAssistantView):
+    """Query the notes by id prefix, domain or update time."""
+
+    url = "/api/entity_notes/query"
+    name = "api:entity_notes_query"
+    requires_auth = True
+
+    async def get(self, request):
+        """Return one page of the notes matching the query parameters."""
+        hass = request.app["hass"]
+        if not await _async_notes_ready(hass):
+            return _notes_unavailable_response()
+        try:
+            params = QUERY_SCHEMA(dict(request.query))
+        except vol.Invalid as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(_async_query_notes(hass, params))
+
+
+class EntityNotesChangesView(HomeAssistantView):
+    """Return the notes changed since a cursor so clients can sync incrementally."""
+
+    url = "/api/entity_notes/changes"
+    name = "api:entity_notes_changes"
+    requires_auth = True
+
+    async def get(self, request):
+        """Return the changes after the since cursor, or all notes if it cannot be continued."""
+        hass = request.app["hass"]
+        if not await _async_notes_ready(hass):
+            return _notes_unavailable_response()
+        change_log = hass.data[DOMAIN]["change_log"]
+        try:
+            limit = min(int(request.query.get("limit", CHANGES_DEFAULT_LIMIT)), CHANGES_MAX_LIMIT)
+            if limit < 1:
+                raise ValueError("limit must be at least 1")
+            changes = change_log.async_changes_since(request.query.get("since"), limit)
+        except ValueError as e:
+            return web.json_response({"error": f"Invalid request: {e}"}, status=400)
+
+        note_types = [
+            note_type
+            for note_type in NOTE_TARGETS
+            if note_type != "device" or hass.data[DOMAIN]["config"][CONF_ENABLE_DEVICE_NOTES]
+        ]
+        result = {_note_target(note_type)["store_key"]: {} for note_type in note_types}
+
+        if changes is None:
+            # Missing, unknown or expired cursor: send every note and start over
+            cursor = change_log.cursor
+            for note_type in note_types:
+                notes = result[_note_target(note_type)["store_key"]]
+                for item_id in list(_notes_data(hass, note_type)):
+                    notes[item_id] = await _async_note_payload(hass, note_type, item_id)
+            return web.json_response({"cursor": cursor, "reset": True, "more": False, **result})
+
+        changed, cursor = changes
+        for note_type, item_id in changed:
+            if note_type not in note_types:
+                continue
+            result[_note_target(note_type)["store_key"]][item_id] = await _async_note_change_payload(
+                hass, note_type, item_id
+            )
+
+        return web.json_response({
+            "cursor": cursor,
+            "reset": False,
+            "more": cursor != change_log.cursor,
+            **result,
+        })
+
+
 class EntityNotesRenderView(HomeAssistantView):
     """Handle rendering Jinja2 templates for Live Preview."""
 
@@ -773,15 +1903,16 @@ class EntityNotesRenderView(HomeAssistantView):
             rendered_note = note
             if note:
                 try:
-                    from homeassistant.helpers.template import Template
-                    tpl = Template(note, hass)
                     user_name = data.get("user_name") or (request.get("hass_user").name if request.get("hass_user") else "User")
                     variables = {"user": user_name}
                     if entity_id:
                         variables["entity_id"] = entity_id
                     if device_id:
                         variables["device_id"] = device_id
-                    rendered_note = str(tpl.async_render(variables, parse_result=False))
+                    note_type, item_id = ("device", device_id) if device_id else ("entity", entity_id or "")
+                    rendered_note = await hass.data[DOMAIN]["render_cache"].async_render_preview(
+                        note_type, item_id, note, variables
+                    )
                 except Exception as e:
                     _LOGGER.debug("Failed to render template during live preview: %s", e)
                     rendered_note = note
@@ -793,68 +1924,56 @@ class EntityNotesRenderView(HomeAssistantView):
             return web.json_response({"rendered_note": data.get("note", "") if "data" in locals() else ""}, status=500)
 
 
+def _bundle_response(request, filename, cache_control):
+    """Return a prebuilt JavaScript bundle, honouring ETags and Accept-Encoding."""
+    hass = request.app["hass"]
+    bundle = hass.data[DOMAIN]["frontend_bundles"].get(filename)
+    if bundle is None:
+        return web.Response(text="// Entity Notes: JavaScript file not found", content_type='application/javascript', status=404)
+
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": bundle.etag,
+        "Vary": "Accept-Encoding",
+    }
+    if bundle.etag in request.headers.get("If-None-Match", ""):
+        return web.Response(status=304, headers=headers)
+
+    body, encoding = bundle.encoded(request.headers.get("Accept-Encoding", ""))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return web.Response(
+        body=body,
+        content_type='application/javascript',
+        charset='utf-8',
+        headers=headers,
+    )
+
+
 class EntityNotesJSView(HomeAssistantView):
-    """Serve the Entity Notes JavaScript file."""
+    """Serve the Entity Notes loader script at its fixed URL."""
 
-    url = "/api/entity_notes/entity-notes.js"
+    url = JS_URL
     name = "api:entity_notes_js"
     requires_auth = False
 
     async def get(self, request):
-        """Serve the JavaScript file."""
-        hass = request.app["hass"]
-        debug_logging = hass.data[DOMAIN]["config"].get(CONF_DEBUG_LOGGING, False)
-        max_note_length = hass.data[DOMAIN]["config"].get(CONF_MAX_NOTE_LENGTH, 200)
-        hide_buttons_when_empty = hass.data[DOMAIN]["config"].get(CONF_HIDE_BUTTONS_WHEN_EMPTY, False)
-        hide_buttons_until_focus = hass.data[DOMAIN]["config"].get(CONF_HIDE_BUTTONS_UNTIL_FOCUS, False)
-        hide_char_count_until_focus = hass.data[DOMAIN]["config"].get(CONF_HIDE_CHAR_COUNT_UNTIL_FOCUS, False)
-        enable_device_notes = hass.data[DOMAIN]["config"].get(CONF_ENABLE_DEVICE_NOTES, True)
-        hide_markdown_toolbar = hass.data[DOMAIN]["config"].get(CONF_HIDE_MARKDOWN_TOOLBAR, DEFAULT_HIDE_MARKDOWN_TOOLBAR)
-        show_markdown_toolbar = not hide_markdown_toolbar
-        confirm_delete = hass.data[DOMAIN]["config"].get(CONF_CONFIRM_DELETE, True)
-        hide_preview_button = hass.data[DOMAIN]["config"].get(CONF_HIDE_PREVIEW_BUTTON, False)
-        hide_markdown_hints = hass.data[DOMAIN]["config"].get(CONF_HIDE_MARKDOWN_HINTS, False)
-        empty_note_placeholder = hass.data[DOMAIN]["config"].get(CONF_EMPTY_NOTE_PLACEHOLDER, "")
-        hide_last_modified = hass.data[DOMAIN]["config"].get(CONF_HIDE_LAST_MODIFIED, False)
-
-        # Get the JavaScript file path
-        js_file_path = Path(__file__).parent / FRONTEND_JS_PATH
+        """Serve the loader script, revalidated on every load."""
+        return _bundle_response(request, FRONTEND_JS_PATH, "no-cache")
 
-        try:
-            # Use async_add_executor_job to avoid blocking the event loop
-            def read_file():
-                with open(js_file_path, 'r') as f:
-                    return f.read()
-
-            js_content = await hass.async_add_executor_job(read_file)
-
-            # Replace configuration placeholders
-            js_content = js_content.replace('{{DEBUG_LOGGING}}', str(debug_logging).lower())
-            js_content = js_content.replace('{{MAX_NOTE_LENGTH}}', str(max_note_length))
-            js_content = js_content.replace('{{HIDE_BUTTONS_WHEN_EMPTY}}', str(hide_buttons_when_empty).lower())
-            js_content = js_content.replace('{{HIDE_BUTTONS_UNTIL_FOCUS}}', str(hide_buttons_until_focus).lower())
-            js_content = js_content.replace('{{HIDE_CHAR_COUNT_UNTIL_FOCUS}}', str(hide_char_count_until_focus).lower())
-            js_content = js_content.replace('{{ENABLE_DEVICE_NOTES}}', str(enable_device_notes).lower())
-            js_content = js_content.replace('{{CONFIRM_DELETE}}', str(confirm_delete).lower())
-            js_content = js_content.replace('{{SHOW_MARKDOWN_TOOLBAR}}', str(show_markdown_toolbar).lower())
-            js_content = js_content.replace('{{HIDE_PREVIEW_BUTTON}}', str(hide_preview_button).lower())
-            js_content = js_content.replace('{{HIDE_MARKDOWN_HINTS}}', str(hide_markdown_hints).lower())
-            js_content = js_content.replace('{{EMPTY_NOTE_PLACEHOLDER}}', json.dumps(empty_note_placeholder))
-            js_content = js_content.replace('{{HIDE_LAST_MODIFIED}}', str(hide_last_modified).lower())
-
-            return web.Response(
-                text=js_content,
-                content_type='application/javascript',
-                headers={
-                    "Cache-Control": "no-cache, no-store, must-revalidate",
-                    "Pragma": "no-cache",
-                    "Expires": "0"
-                }
-            )
 
-        except FileNotFoundError:
-            _LOGGER.error("JavaScript file not found: %s", js_file_path)
-            return web.Response(text="// Entity Notes: JavaScript file not found", content_type='application/javascript', status=404)
-        except Exception as e:
-            _LOGGER.error("Error serving JavaScript file: %s", e)
-            return web.Response(text="// Entity Notes: Error loading script", content_type='application/javascript', status=500)
+class EntityNotesVersionedJSView(HomeAssistantView):
+    """Serve the Entity Notes loader and editor scripts at their content-hashed URLs."""
+
+    url = VERSIONED_JS_URL
+    name = "api:entity_notes_js_versioned"
+    requires_auth = False
+
+    async def get(self, request, version, filename):
+        """Serve a script, cacheable forever if the hash is current."""
+        bundle = request.app["hass"].data[DOMAIN]["frontend_bundles"].get(filename)
+        if bundle is not None and version == bundle.version:
+            return _bundle_response(request, filename, IMMUTABLE_CACHE_CONTROL)
+        # A page loaded before an options change asks for an old hash; serve the
+        # current script but do not let it be cached under the old URL
+        return _bundle_response(request, filename, "no-cache")
@@ -0,0 +1,260 @@
+"""Automatic note backups for Entity Notes."""
+from __future__ import annotations
+
+import asyncio
+import calendar
+from dataclasses import dataclass
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+
+from .changes import ChangeLog
+from .const import (
+    BACKUP_DIR,
+    BACKUP_FILE_VERSION,
+    BACKUP_SNAPSHOT_INTERVAL,
+    CHANGE_LOG_SIZE,
+)
+from .records import CompressedNoteRecord, NoteRecord, dump_notes
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKUP_FILE_PATTERN = re.compile(r"(snapshot|delta)-(\d{8}T\d{6}Z)\.json\.gz")
+TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+
+# store_key -> item_id -> record
+NotesSnapshot = dict[str, dict[str, NoteRecord | CompressedNoteRecord]]
+
+
+@dataclass(slots=True)
+class BackupFile:
+    """A snapshot of every note, or a delta with the notes changed since the previous backup."""
+
+    kind: str
+    created_at: int
+
+    @property
+    def name(self) -> str:
+        """Return the name of the backup, which is also its file name without extension."""
+        return f"{self.kind}-{time.strftime(TIME_FORMAT, time.gmtime(self.created_at))}"
+
+    @property
+    def filename(self) -> str:
+        """Return the file name of the backup."""
+        return f"{self.name}.json.gz"
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the backup as listed by the list_backups service."""
+        return {"name": self.name, "kind": self.kind, "created_at": self.created_at}
+
+
+def _list_backups(path: str) -> list[BackupFile]:
+    """Return the backups in a directory, oldest first. Runs in the executor."""
+    try:
+        filenames = os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+    backups = []
+    for filename in filenames:
+        if (match := BACKUP_FILE_PATTERN.fullmatch(filename)) is None:
+            continue
+        created_at = calendar.timegm(time.strptime(match.group(2), TIME_FORMAT))
+        backups.append(BackupFile(match.group(1), created_at))
+    backups.sort(key=lambda backup: (backup.created_at, backup.kind != "snapshot"))
+    return backups
+
+
+def _write_backup(path: str, data: dict[str, Any]) -> None:
+    """Write a gzip-compressed JSON backup atomically. Runs in the executor."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6) as gzip_file:
+            gzip_file.write(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def _read_backup(path: str) -> dict[str, Any]:
+    """Read a gzip-compressed JSON backup. Runs in the executor."""
+    with gzip.open(path, "rb") as file:
+        return json.loads(file.read())
+
+
+def _remove_backups(paths: list[str]) -> None:
+    """Remove backup files. Runs in the executor."""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class NoteBackups:
+    """Rotated, compressed backups made of full snapshots and incremental deltas.
+
+    A backup is a full snapshot when there is no recent snapshot or the
+    changes since the previous backup are no longer known, such as after a
+    restart or a restore. Otherwise it is a delta holding only the notes
+    changed since the previous backup, with deleted notes as null. Restoring
+    to a point in time reads the latest snapshot before it and replays the
+    deltas after that snapshot. Snapshots older than the retention period
+    are removed together with their deltas; the newest snapshot is always
+    kept.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        data_func: Callable[[], NotesSnapshot],
+        note_func: Callable[[str, str], NoteRecord | CompressedNoteRecord | None],
+        change_log: ChangeLog,
+        retention_days: int,
+    ) -> None:
+        """Initialize the backups."""
+        self.hass = hass
+        self.path = hass.config.path(BACKUP_DIR)
+        self._data_func = data_func
+        self._note_func = note_func
+        self._change_log = change_log
+        self._retention = retention_days * 86400
+        self._backups: list[BackupFile] = []
+        self._cursor: str | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def backups(self) -> list[BackupFile]:
+        """Return the backups, oldest first."""
+        return list(self._backups)
+
+    async def async_load(self) -> None:
+        """Find the existing backups."""
+        self._backups = await self.hass.async_add_executor_job(_list_backups, self.path)
+
+    def _file_path(self, backup: BackupFile) -> str:
+        """Return the path of a backup file."""
+        return os.path.join(self.path, backup.filename)
+
+    def _next_created_at(self) -> int:
+        """Return a creation time later than every existing backup, so names never collide."""
+        created_at = int(time.time())
+        if self._backups and created_at <= self._backups[-1].created_at:
+            created_at = self._backups[-1].created_at + 1
+        return created_at
+
+    async def async_backup(self, full: bool = False) -> BackupFile | None:
+        """Write a snapshot or a delta; returns None if nothing changed since the last backup."""
+        async with self._lock:
+            cursor = self._change_log.cursor
+            changes = self._change_log.async_changes_since(self._cursor, CHANGE_LOG_SIZE)
+            snapshots = [backup for backup in self._backups if backup.kind == "snapshot"]
+            if not full and changes is not None and not changes[0]:
+                return None
+
+            created_at = self._next_created_at()
+            if (
+                full
+                or changes is None
+                or not snapshots
+                or created_at - snapshots[-1].created_at >= BACKUP_SNAPSHOT_INTERVAL
+            ):
+                backup = BackupFile("snapshot", created_at)
+                # data_func returns copies and records are replaced rather than
+                # changed, so the notes can be serialized in the executor while
+                # they keep changing
+                notes = self._data_func()
+
+                def build_data() -> dict[str, Any]:
+                    return {store_key: dump_notes(records) for store_key, records in notes.items()}
+            else:
+                backup = BackupFile("delta", created_at)
+                changed = [
+                    (f"{note_type}_notes", item_id, self._note_func(note_type, item_id))
+                    for note_type, item_id in changes[0]
+                ]
+                base = snapshots[-1].name
+
+                def build_data() -> dict[str, Any]:
+                    data: dict[str, Any] = {"base": base, "entity_notes": {}, "device_notes": {}}
+                    for store_key, item_id, record in changed:
+                        data.setdefault(store_key, {})[item_id] = record.as_dict() if record else None
+                    return data
+
+            def write() -> None:
+                _write_backup(
+                    self._file_path(backup),
+                    {"version": BACKUP_FILE_VERSION, "kind": backup.kind, "created_at": created_at, **build_data()},
+                )
+
+            await self.hass.async_add_executor_job(write)
+            self._backups.append(backup)
+            self._cursor = cursor
+            _LOGGER.debug("Wrote note backup %s", backup.name)
+
+            await self._async_rotate()
+            return backup
+
+    async def _async_rotate(self) -> None:
+        """Remove snapshots past the retention period and the deltas that depend on them."""
+        snapshots = [backup for backup in self._backups if backup.kind == "snapshot"]
+        cutoff = time.time() - self._retention
+        expired = [backup for backup in snapshots[:-1] if backup.created_at < cutoff]
+        if not expired:
+            return
+
+        # Everything before the oldest snapshot that is kept depends on an expired one
+        keep_from = next(backup for backup in snapshots if backup not in expired).created_at
+        removed = [backup for backup in self._backups if backup.created_at < keep_from]
+        self._backups = [backup for backup in self._backups if backup.created_at >= keep_from]
+        await self.hass.async_add_executor_job(
+            _remove_backups, [self._file_path(backup) for backup in removed]
+        )
+        _LOGGER.debug("Removed %d expired note backups", len(removed))
+
+    def find(self, name: str) -> BackupFile | None:
+        """Return the backup with a name, with or without its file extension."""
+        name = name.removesuffix(".json.gz")
+        return next((backup for backup in self._backups if backup.name == name), None)
+
+    async def async_read(self, at: int | None = None) -> tuple[BackupFile, int, dict[str, dict[str, Any]]]:
+        """Return the notes as they were at a point in time, in their stored form.
+
+        Reads the latest snapshot at or before ``at`` (the newest one by
+        default) and applies its deltas up to ``at``. Returns the snapshot,
+        the number of deltas applied and the notes. Raises LookupError if
+        there is no snapshot that old.
+        """
+        async with self._lock:
+            backups = [backup for backup in self._backups if at is None or backup.created_at <= at]
+            snapshot_index = next(
+                (index for index in range(len(backups) - 1, -1, -1) if backups[index].kind == "snapshot"),
+                None,
+            )
+            if snapshot_index is None:
+                raise LookupError("No note backup found for that time")
+            snapshot = backups[snapshot_index]
+            deltas = backups[snapshot_index + 1:]
+            paths = [self._file_path(backup) for backup in [snapshot, *deltas]]
+
+        def read() -> dict[str, dict[str, Any]]:
+            data = _read_backup(paths[0])
+            notes = {store_key: data.get(store_key, {}) for store_key in ("entity_notes", "device_notes")}
+            for path in paths[1:]:
+                delta = _read_backup(path)
+                for store_key, store_notes in notes.items():
+                    for item_id, raw_note in delta.get(store_key, {}).items():
+                        if raw_note is None:
+                            store_notes.pop(item_id, None)
+                        else:
+                            store_notes[item_id] = raw_note
+            return notes
+
+        return snapshot, len(deltas), await self.hass.async_add_executor_job(read)
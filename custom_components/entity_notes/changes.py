@@ -0,0 +1,85 @@
+"""Change tracking for Entity Notes."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import secrets
+
+from homeassistant.core import callback
+
+from .const import CHANGE_LOG_SIZE
+
+# (note_type, item_id)
+NoteKey = tuple[str, str]
+
+
+class ChangeLog:
+    """Monotonic sequence of note changes since the notes were loaded.
+
+    Each change gets the next sequence number; only the latest change of a
+    note is kept, so a deleted note stays as its tombstone until it is set
+    again. Cursors are ``epoch:seq``. The epoch changes every time the notes
+    are (re)loaded, and a cursor from another epoch or older than the oldest
+    change still kept cannot be continued, so the client has to resync.
+    """
+
+    def __init__(self, max_size: int = CHANGE_LOG_SIZE) -> None:
+        """Initialize an empty change log."""
+        self._max_size = max_size
+        self._latest: OrderedDict[NoteKey, int] = OrderedDict()
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self._oldest_seq = 0
+
+    @property
+    def cursor(self) -> str:
+        """Return the cursor of the latest change."""
+        return f"{self.epoch}:{self.seq}"
+
+    @property
+    def size(self) -> int:
+        """Return the number of notes with a tracked change."""
+        return len(self._latest)
+
+    @callback
+    def async_record(self, note_type: str, item_id: str) -> None:
+        """Record that a note was set or deleted."""
+        self.seq += 1
+        key = (note_type, item_id)
+        self._latest[key] = self.seq
+        self._latest.move_to_end(key)
+        if len(self._latest) > self._max_size:
+            _key, self._oldest_seq = self._latest.popitem(last=False)
+
+    @callback
+    def async_reset(self) -> None:
+        """Start a new epoch after the notes were replaced in bulk."""
+        self._latest.clear()
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self._oldest_seq = 0
+
+    @callback
+    def async_changes_since(self, cursor: str | None, limit: int) -> tuple[list[NoteKey], str] | None:
+        """Return the notes changed after a cursor, oldest change first, and the next cursor.
+
+        At most ``limit`` changes are returned; the next cursor then points at
+        the last of them. Returns None when the cursor cannot be continued.
+        Raises ValueError for a malformed cursor.
+        """
+        if not cursor:
+            return None
+        epoch, _sep, seq_text = cursor.partition(":")
+        seq = int(seq_text)
+        if epoch != self.epoch or seq < self._oldest_seq or seq > self.seq:
+            return None
+
+        changed = []
+        for key in reversed(self._latest):
+            if self._latest[key] <= seq:
+                break
+            changed.append(key)
+        changed.reverse()
+        if len(changed) > limit:
+            changed = changed[:limit]
+            return changed, f"{self.epoch}:{self._latest[changed[-1]]}"
+        return changed, self.cursor
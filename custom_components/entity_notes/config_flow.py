@@ -26,6 +26,16 @@ from .const import (
     CONF_HIDE_MARKDOWN_HINTS,
     CONF_EMPTY_NOTE_PLACEHOLDER,
     CONF_HIDE_LAST_MODIFIED,
+    CONF_SAVE_DELAY,
+    CONF_STORAGE_BACKEND,
+    CONF_RENDER_BUDGET,
+    CONF_ORPHAN_SWEEP_INTERVAL,
+    CONF_EVENT_MODE,
+    CONF_RECORD_EVENTS,
+    CONF_BACKGROUND_LOAD,
+    CONF_COMPRESS_NOTES,
+    CONF_BACKUP_INTERVAL,
+    CONF_BACKUP_RETENTION,
     DEFAULT_DEBUG_LOGGING,
     DEFAULT_MAX_NOTE_LENGTH,
     DEFAULT_AUTO_BACKUP,
@@ -40,6 +50,20 @@ from .const import (
     DEFAULT_HIDE_MARKDOWN_HINTS,
     DEFAULT_EMPTY_NOTE_PLACEHOLDER,
     DEFAULT_HIDE_LAST_MODIFIED,
+    DEFAULT_SAVE_DELAY,
+    DEFAULT_STORAGE_BACKEND,
+    DEFAULT_RENDER_BUDGET,
+    DEFAULT_ORPHAN_SWEEP_INTERVAL,
+    DEFAULT_EVENT_MODE,
+    DEFAULT_RECORD_EVENTS,
+    DEFAULT_BACKGROUND_LOAD,
+    DEFAULT_COMPRESS_NOTES,
+    DEFAULT_BACKUP_INTERVAL,
+    DEFAULT_BACKUP_RETENTION,
+    EVENT_MODES,
+    PLAIN_MAX_NOTE_LENGTH,
+    COMPRESSED_MAX_NOTE_LENGTH,
+    STORAGE_BACKENDS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -66,8 +90,18 @@ SECTION_CONFIG = [
     ]),
     (SECTION_ADVANCED, [
         (CONF_DEBUG_LOGGING, DEFAULT_DEBUG_LOGGING, bool),
-        (CONF_MAX_NOTE_LENGTH, DEFAULT_MAX_NOTE_LENGTH, vol.All(int, vol.Range(min=50, max=2000))),
+        (CONF_MAX_NOTE_LENGTH, DEFAULT_MAX_NOTE_LENGTH, vol.All(int, vol.Range(min=50, max=COMPRESSED_MAX_NOTE_LENGTH))),
+        (CONF_COMPRESS_NOTES, DEFAULT_COMPRESS_NOTES, bool),
         (CONF_AUTO_BACKUP, DEFAULT_AUTO_BACKUP, bool),
+        (CONF_BACKUP_INTERVAL, DEFAULT_BACKUP_INTERVAL, vol.All(int, vol.Range(min=1, max=168))),
+        (CONF_BACKUP_RETENTION, DEFAULT_BACKUP_RETENTION, vol.All(int, vol.Range(min=1, max=365))),
+        (CONF_SAVE_DELAY, DEFAULT_SAVE_DELAY, vol.All(int, vol.Range(min=0, max=300))),
+        (CONF_STORAGE_BACKEND, DEFAULT_STORAGE_BACKEND, vol.In(STORAGE_BACKENDS)),
+        (CONF_RENDER_BUDGET, DEFAULT_RENDER_BUDGET, vol.All(int, vol.Range(min=0, max=10000))),
+        (CONF_ORPHAN_SWEEP_INTERVAL, DEFAULT_ORPHAN_SWEEP_INTERVAL, vol.All(int, vol.Range(min=0, max=168))),
+        (CONF_EVENT_MODE, DEFAULT_EVENT_MODE, vol.In(EVENT_MODES)),
+        (CONF_RECORD_EVENTS, DEFAULT_RECORD_EVENTS, bool),
+        (CONF_BACKGROUND_LOAD, DEFAULT_BACKGROUND_LOAD, bool),
     ]),
 ]
 
@@ -108,8 +142,11 @@ def validate_options(user_input: dict[str, Any]) -> dict[str, str]:
     errors = {}
     advanced_data = user_input.get(SECTION_ADVANCED, user_input)
     max_length = advanced_data.get(CONF_MAX_NOTE_LENGTH, DEFAULT_MAX_NOTE_LENGTH)
-    if max_length < 50 or max_length > 2000:
+    compress_notes = advanced_data.get(CONF_COMPRESS_NOTES, DEFAULT_COMPRESS_NOTES)
+    if max_length < 50 or max_length > COMPRESSED_MAX_NOTE_LENGTH:
         errors[CONF_MAX_NOTE_LENGTH] = "invalid_max_length"
+    elif max_length > PLAIN_MAX_NOTE_LENGTH and not compress_notes:
+        errors[CONF_MAX_NOTE_LENGTH] = "max_length_requires_compression"
     return errors
 
 
@@ -220,7 +257,8 @@ class EntityNotesConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors = validate_options(user_input)
 
             if not errors:
-                return self.async_update_reload_and_abort(
+                # The update listener reloads the integration when the options change
+                return self.async_update_and_abort(
                     entry,
                     data={},
                     options=normalize_options(user_input),
@@ -259,17 +297,12 @@ class EntityNotesOptionsFlow(config_entries.OptionsFlow):
             errors = validate_options(user_input)
 
             if not errors:
-                # Create the options entry first
-                result = self.async_create_entry(
+                # The update listener reloads the integration once the options are saved
+                return self.async_create_entry(
                     title="",
                     data=normalize_options(user_input)
                 )
 
-                # Automatically reload the integration to apply the new settings
-                await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-
-                return result
-
         current_options = self.config_entry.options or {}
         return self.async_show_form(
             step_id="init",
@@ -4,7 +4,11 @@ DOMAIN = "entity_notes"
 
 STORAGE_VERSION = 2
 STORAGE_KEY = "entity_notes.notes"
+V1_BACKUP_FILE = "entity_notes.notes.backup_v1"  # copy of version 1 data kept by the migration
 MAX_NOTE_LENGTH = 200
+PLAIN_MAX_NOTE_LENGTH = 2000  # longest note length allowed without compression
+COMPRESSED_MAX_NOTE_LENGTH = 20000  # longest note length allowed with compression
+COMPRESS_MIN_LENGTH = 1000  # notes at least this long are stored compressed
 
 # Configuration keys
 CONF_DEBUG_LOGGING = "debug_logging"
@@ -23,24 +27,98 @@ CONF_HIDE_PREVIEW_BUTTON = "hide_preview_button"
 CONF_HIDE_MARKDOWN_HINTS = "hide_markdown_hints"
 CONF_EMPTY_NOTE_PLACEHOLDER = "empty_note_placeholder"
 CONF_HIDE_LAST_MODIFIED = "hide_last_modified"
+CONF_SAVE_DELAY = "save_delay"
+CONF_STORAGE_BACKEND = "storage_backend"
+CONF_RENDER_BUDGET = "render_budget"
+CONF_ORPHAN_SWEEP_INTERVAL = "orphan_sweep_interval"
+CONF_EVENT_MODE = "event_mode"
+CONF_RECORD_EVENTS = "record_events"
+CONF_BACKGROUND_LOAD = "background_load"
+CONF_COMPRESS_NOTES = "compress_notes"
+CONF_BACKUP_INTERVAL = "backup_interval"
+CONF_BACKUP_RETENTION = "backup_retention"
+
+# Storage backends
+STORAGE_BACKEND_SINGLE = "single"
+STORAGE_BACKEND_JOURNAL = "journal"
+STORAGE_BACKEND_SHARDED = "sharded"
+STORAGE_BACKENDS = [STORAGE_BACKEND_SINGLE, STORAGE_BACKEND_JOURNAL, STORAGE_BACKEND_SHARDED]
+JOURNAL_MAX_BYTES = 1024 * 1024  # compact the journal into the snapshot past this size
+
+# Automatic backups
+BACKUP_DIR = "entity_notes_backups"  # in the config directory
+BACKUP_FILE_VERSION = 1
+BACKUP_SNAPSHOT_INTERVAL = 86400  # seconds between full snapshots; backups in between are deltas
+LEGACY_BACKUP_FILE = "entity_notes_backup.json"  # written by backup_notes before automatic backups
+
+# Background loading
+NOTES_LOAD_TIMEOUT = 30  # seconds a request waits for notes still loading in the background
+
+# Rendering
+TEMPLATE_CACHE_SIZE = 256  # compiled note templates kept in memory
+RENDER_CACHE_SIZE = 1024  # rendered notes kept in memory, per note and user
+RENDER_STRIKES_BEFORE_COOLDOWN = 2  # over-budget renders before a note cools down
+RENDER_COOLDOWN = 300  # seconds a slow note is served from its last render
+
+# Batch API
+BATCH_MAX_IDS = 10000  # ids accepted in one batch request
+BATCH_STREAM_THRESHOLD = 500  # ids above which the batch response is streamed
+BATCH_STREAM_CHUNK = 100  # notes written per streamed chunk
+
+# Service responses
+NOTE_FIELDS = ["note", "updated_at"]  # fields a get or list response can select
+LIST_DEFAULT_LIMIT = 100  # notes per list response page
+LIST_MAX_LIMIT = 1000
+
+# Search
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 500
+
+# Change feed
+CHANGE_LOG_SIZE = 10000  # notes whose latest change is remembered for delta syncs
+CHANGES_DEFAULT_LIMIT = 500
+CHANGES_MAX_LIMIT = 5000
+
+# Orphan sweep
+ORPHAN_SWEEP_STARTUP_DELAY = 600  # seconds after Home Assistant has started before the first sweep
 
 # Events
 EVENT_NOTES_UPDATED = "entity_notes_updated"
 EVENT_DEVICE_NOTES_UPDATED = "device_notes_updated"
+EVENT_NOTES_BULK_UPDATED = "entity_notes_bulk_updated"
+EVENT_DEVICE_NOTES_BULK_UPDATED = "device_notes_bulk_updated"
+EVENT_ORPHANS_SWEPT = "entity_notes_orphans_swept"
+
+# Dispatcher signals
+SIGNAL_NOTE_CHANGED = f"{DOMAIN}_note_changed"  # (note_type, item_id)
+SIGNAL_NOTES_RELOADED = f"{DOMAIN}_notes_reloaded"
+
+# Event modes
+EVENT_MODE_FULL = "full"  # update events carry the note text
+EVENT_MODE_SLIM = "slim"  # update events carry the change kind, updated_at and a text hash
+EVENT_MODES = [EVENT_MODE_FULL, EVENT_MODE_SLIM]
 
 # Services - Entity
 SERVICE_SET_NOTE = "set_note"
 SERVICE_GET_NOTE = "get_note"
 SERVICE_DELETE_NOTE = "delete_note"
 SERVICE_LIST_NOTES = "list_notes"
+SERVICE_SET_NOTES = "set_notes"
+SERVICE_DELETE_NOTES = "delete_notes"
 SERVICE_BACKUP_NOTES = "backup_notes"
 SERVICE_RESTORE_NOTES = "restore_notes"
+SERVICE_LIST_BACKUPS = "list_backups"
+SERVICE_SWEEP_ORPHANS = "sweep_orphans"
+SERVICE_SEARCH = "search"
+SERVICE_QUERY = "query"
 
 # Services - Device
 SERVICE_SET_DEVICE_NOTE = "set_device_note"
 SERVICE_GET_DEVICE_NOTE = "get_device_note"
 SERVICE_DELETE_DEVICE_NOTE = "delete_device_note"
 SERVICE_LIST_DEVICE_NOTES = "list_device_notes"
+SERVICE_SET_DEVICE_NOTES = "set_device_notes"
+SERVICE_DELETE_DEVICE_NOTES = "delete_device_notes"
 
 # Default configuration values
 DEFAULT_DEBUG_LOGGING = False
@@ -59,6 +137,17 @@ DEFAULT_HIDE_PREVIEW_BUTTON = False
 DEFAULT_HIDE_MARKDOWN_HINTS = False
 DEFAULT_EMPTY_NOTE_PLACEHOLDER = ""
 DEFAULT_HIDE_LAST_MODIFIED = False
+DEFAULT_SAVE_DELAY = 5  # seconds; 0 writes every change immediately
+DEFAULT_STORAGE_BACKEND = "single"
+DEFAULT_RENDER_BUDGET = 250  # milliseconds; 0 disables the render budget
+DEFAULT_ORPHAN_SWEEP_INTERVAL = 24  # hours; 0 disables the periodic orphan sweep
+DEFAULT_EVENT_MODE = "full"
+DEFAULT_RECORD_EVENTS = True
+DEFAULT_BACKGROUND_LOAD = False
+DEFAULT_COMPRESS_NOTES = False
+DEFAULT_BACKUP_INTERVAL = 1  # hours between automatic backups
+DEFAULT_BACKUP_RETENTION = 7  # days snapshots are kept
 
 # File paths
-FRONTEND_JS_PATH = "entity-notes.js"
+FRONTEND_JS_PATH = "entity-notes.js"  # small loader added to every page
+FRONTEND_EDITOR_JS_PATH = "entity-notes-editor.js"  # note card, imported on first use
@@ -0,0 +1,60 @@
+"""Diagnostics support for Entity Notes."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .records import CompressedNoteRecord
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry. Note contents are never included."""
+    data = hass.data.get(DOMAIN, {})
+    store = data.get("store")
+    template_cache = data.get("template_cache")
+    render_cache = data.get("render_cache")
+    search_index = data.get("search_index")
+    query_index = data.get("query_index")
+    change_log = data.get("change_log")
+    backups = data.get("backups")
+
+    return {
+        "options": dict(entry.options),
+        "notes_loaded": bool(data.get("notes_loaded") and data["notes_loaded"].done()),
+        "notes": {
+            "entity": len(data.get("entity_notes", {})),
+            "device": len(data.get("device_notes", {})),
+            "compressed": sum(
+                isinstance(record, CompressedNoteRecord)
+                for store_key in ("entity_notes", "device_notes")
+                for record in data.get(store_key, {}).values()
+            ),
+        },
+        "storage": {
+            "dirty": store.dirty if store else False,
+            **(store.stats if store else {}),
+        },
+        "template_cache": {
+            "size": template_cache.size if template_cache else 0,
+            **(template_cache.stats if template_cache else {}),
+        },
+        "render_cache": {
+            "size": render_cache.size if render_cache else 0,
+            **(render_cache.stats if render_cache else {}),
+        },
+        "search_index": search_index.stats if search_index else {},
+        "query_index": query_index.stats if query_index else {},
+        "change_log": {
+            "seq": change_log.seq if change_log else 0,
+            "size": change_log.size if change_log else 0,
+        },
+        "backups": {
+            "snapshots": sum(backup.kind == "snapshot" for backup in backups.backups) if backups else 0,
+            "deltas": sum(backup.kind == "delta" for backup in backups.backups) if backups else 0,
+        },
+    }
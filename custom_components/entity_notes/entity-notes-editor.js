@@ -0,0 +1,1358 @@
+// Entity Notes editor module: the note card, Markdown editor and translations.
+// Imported on demand by the loader in entity-notes.js, which defines
+// window.entityNotes (configuration) and the shared loggers used below.
+const { debugLog, infoLog } = window.entityNotes;
+
+window.entityNotes.strings = {
+    en: {
+        save: 'SAVE',
+        delete: 'DELETE',
+        preview: 'Preview',
+        add_note: 'Add a note...',
+        markdown_hints: 'Notes (# H1, ## H2, **bold**, *italic*, - bullets, 1. numbered, --- divider, `inline code`, > blockquote, ~strikethrough~)',
+        preview_empty: 'Preview (empty)',
+        confirm_delete: 'Are you sure you want to delete the note for {type} {item_id}?',
+        toolbar_toggle_preview: 'Toggle Live Preview',
+        toolbar_undo: 'Undo (Ctrl+Z)',
+        toolbar_redo: 'Redo (Ctrl+Y)',
+        toolbar_heading1: 'Heading 1',
+        toolbar_heading2: 'Heading 2',
+        toolbar_bold: 'Bold',
+        toolbar_italic: 'Italic',
+        toolbar_bullet_list: 'Bullet list',
+        toolbar_numbered_list: 'Numbered list',
+        toolbar_divider: 'Divider',
+        toolbar_inline_code: 'Inline Code',
+        toolbar_code_block: 'Code Block',
+        toolbar_insert_link: 'Insert Link',
+        toolbar_blockquote: 'Blockquote',
+        toolbar_strikethrough: 'Strikethrough',
+        error_loading_note: 'Error loading note.',
+        prompt_link_text: 'Enter link text:',
+        prompt_link_url: 'Enter URL:',
+    },
+    // Community translations — add your language here and open a pull request.
+    // Keys must match the 'en' block above. Missing keys fall back to English.
+};
+
+function localize(key, replacements) {
+    const ha = document.querySelector('home-assistant');
+    const lang = ha?.hass?.language || 'en';
+    const strings = window.entityNotes.strings[lang] || window.entityNotes.strings['en'];
+    let str = strings[key] ?? window.entityNotes.strings['en'][key] ?? key;
+    if (replacements) {
+        for (const [k, v] of Object.entries(replacements)) {
+            str = str.replace(`{${k}}`, v);
+        }
+    }
+    return str;
+}
+
+function emptyNotePlaceholder() {
+    const customPlaceholder = window.entityNotes.emptyNotePlaceholder;
+    if (typeof customPlaceholder === 'string' && customPlaceholder.trim().length > 0) {
+        return customPlaceholder.trim();
+    }
+    return localize('add_note');
+}
+
+// Notes already loaded on this page, shared by every card and keyed by
+// "type:itemId". Each entry holds the API response, the user it was rendered
+// for and its ETag, so reopening a dialog shows the note immediately and only
+// revalidates it with a conditional request.
+const noteCache = new Map();
+
+function noteCacheKey(type, itemId) {
+    return `${type}:${itemId}`;
+}
+
+class EntityNotesCard extends HTMLElement {
+    constructor() {
+        super();
+        this.attachShadow({ mode: 'open' });
+        this.hasExistingNote = false;
+        this.isEditing = false;
+        this.initialState = null;
+        this.redoState = null;
+        this.isPreviewVisible = false;
+        this.updatedAt = null;
+        this.renderedNote = null;
+        debugLog('Entity Notes: EntityNotesCard constructor called');
+    }
+
+    get currentUserName() {
+        try {
+            if (this.hass && this.hass.user) return this.hass.user.name;
+            const ha = document.querySelector('home-assistant');
+            if (ha && ha.hass && ha.hass.user) {
+                return ha.hass.user.name;
+            }
+        } catch (e) {
+            debugLog('Entity Notes: Error getting user name: ' + e);
+        }
+        return "User";
+    }
+
+    get accessToken() {
+        try {
+            if (this.hass && this.hass.auth && this.hass.auth.data) return this.hass.auth.data.access_token;
+            const ha = document.querySelector('home-assistant');
+            if (ha && ha.hass && ha.hass.auth && ha.hass.auth.data) {
+                return ha.hass.auth.data.access_token;
+            }
+        } catch (e) {
+            debugLog('Entity Notes: Error getting access token: ' + e);
+        }
+        return null;
+    }
+
+    apiHeaders(includeContentType = false) {
+        const headers = {};
+        if (includeContentType) {
+            headers['Content-Type'] = 'application/json';
+        }
+
+        const token = this.accessToken;
+        if (token) {
+            headers['Authorization'] = `Bearer ${token}`;
+        }
+
+        return headers;
+    }
+
+    async authenticatedFetch(url, options = {}) {
+        const ha = document.querySelector('home-assistant');
+        const hass = this.hass || (ha && ha.hass);
+
+        options.headers = options.headers || {};
+        if (options.body && !options.headers['Content-Type']) {
+            options.headers['Content-Type'] = 'application/json';
+        }
+
+        // Use HA's built-in fetch method, which automatically renews expired tokens
+        if (hass && typeof hass.fetchWithAuth === 'function') {
+            return await hass.fetchWithAuth(url, options);
+        }
+
+        // Fallback for unforeseen environments
+        const token = this.accessToken;
+        if (token) {
+            options.headers['Authorization'] = `Bearer ${token}`;
+        }
+        return await fetch(url, options);
+    }
+
+    connectedCallback() {
+        debugLog('Entity Notes: EntityNotesCard connected');
+        this.render();
+        this.setupEventListeners();
+    }
+
+    render() {
+        const maxLength = window.entityNotes.maxNoteLength;
+        const previewButtonHtml = window.entityNotes.hidePreviewButton ? '' :
+            `<button class="entity-notes-md-button" data-action="toggle-preview" title="${localize('toolbar_toggle_preview')}" style="width: auto; padding: 0 8px;" disabled>${localize('preview')}</button>`;
+        const initialPlaceholder = window.entityNotes.hideMarkdownHints ? emptyNotePlaceholder() : localize('markdown_hints');
+        this.shadowRoot.innerHTML = `
+            <style>
+                .entity-notes-container {
+                    margin: 8px 0;
+                    padding: 8px;
+                    border: none;
+                    border-radius: 4px;
+                    background: transparent;
+                    display: flex;
+                    flex-direction: column;
+                }
+                .entity-notes-view, .entity-notes-live-preview {
+                    width: 100%;
+                    min-height: 36px;
+                    padding: 6px 8px;
+                    border-radius: 4px;
+                    font-family: inherit;
+                    font-size: 14px;
+                    line-height: 1.4;
+                    box-sizing: border-box;
+                    word-wrap: break-word;
+                }
+                .entity-notes-view {
+                    border: 1px solid var(--divider-color, #e0e0e0);
+                    background: var(--primary-background-color, white);
+                    color: var(--primary-text-color, black);
+                    cursor: text;
+                    order: 1;
+                }
+                .entity-notes-view:hover {
+                    border-color: var(--primary-color, #03a9f4);
+                }
+                .entity-notes-live-preview {
+                    border: 1px dashed var(--primary-color, #03a9f4);
+                    background: var(--secondary-background-color, #f5f5f5);
+                    color: var(--primary-text-color, black);
+                    margin-top: 8px;
+                    order: 4;
+                }
+                .entity-notes-view a, .entity-notes-live-preview a {
+                    color: var(--primary-color, #03a9f4);
+                    text-decoration: underline;
+                }
+                .entity-notes-view a:hover, .entity-notes-live-preview a:hover {
+                    color: var(--accent-color, #0288d1);
+                }
+                .entity-notes-view ul, .entity-notes-live-preview ul,
+                .entity-notes-view ol, .entity-notes-live-preview ol {
+                    margin: 4px 0;
+                    padding-left: 20px;
+                }
+                .entity-notes-view li, .entity-notes-live-preview li {
+                    margin: 2px 0;
+                }
+                .entity-notes-view h1, .entity-notes-live-preview h1 {
+                    font-size: 1.1em;
+                    font-weight: bold;
+                    margin: 6px 0 2px 0;
+                }
+                .entity-notes-view h2, .entity-notes-live-preview h2 {
+                    font-size: 1em;
+                    font-weight: bold;
+                    margin: 4px 0 2px 0;
+                }
+                .entity-notes-view hr, .entity-notes-live-preview hr {
+                    border: none;
+                    border-top: 1px solid var(--divider-color, #e0e0e0);
+                    margin: 6px 0;
+                }
+                .entity-notes-view.hidden, .entity-notes-live-preview.hidden {
+                    display: none;
+                }
+                .entity-notes-textarea {
+                    width: 100%;
+                    min-height: 36px;
+                    max-height: 300px;
+                    padding: 6px 8px;
+                    border: 1px solid var(--divider-color, #e0e0e0);
+                    border-radius: 4px;
+                    background: var(--primary-background-color, white);
+                    color: var(--primary-text-color, black);
+                    font-family: inherit;
+                    font-size: 14px;
+                    line-height: 1.4;
+                    resize: none;
+                    overflow: auto;
+                    box-sizing: border-box;
+                    outline: none;
+                    order: 3;
+                }
+                .entity-notes-textarea:focus {
+                    border-color: var(--primary-color, #03a9f4);
+                    box-shadow: 0 0 0 1px var(--primary-color, #03a9f4);
+                }
+                .entity-notes-textarea.hidden {
+                    display: none;
+                }
+                .entity-notes-actions {
+                    display: flex;
+                    gap: 8px;
+                    margin-top: 8px;
+                    justify-content: flex-end;
+                    transition: opacity 0.2s ease;
+                    order: 6;
+                }
+                .entity-notes-actions.hidden {
+                    display: none;
+                }
+                .entity-notes-button {
+                    padding: 6px 12px;
+                    border: none;
+                    border-radius: 4px;
+                    cursor: pointer;
+                    font-size: 12px;
+                    font-weight: 500;
+                    text-transform: uppercase;
+                }
+                .entity-notes-save {
+                    background: var(--primary-color, #03a9f4);
+                    color: white;
+                }
+                .entity-notes-delete {
+                    background: var(--error-color, #f44336);
+                    color: white;
+                }
+                .entity-notes-footer {
+                    display: flex;
+                    justify-content: space-between;
+                    align-items: center;
+                    margin-top: 4px;
+                    order: 5;
+                    flex-wrap: wrap;
+                }
+                .entity-notes-timestamp {
+                    font-size: 11px;
+                    color: var(--secondary-text-color, #666);
+                }
+                .entity-notes-timestamp.hidden {
+                    display: none;
+                }
+                .entity-notes-char-count {
+                    font-size: 11px;
+                    color: var(--secondary-text-color, #666);
+                    margin-left: auto;
+                }
+                .entity-notes-char-count.warning {
+                    color: var(--warning-color, #ff9800);
+                }
+                .entity-notes-char-count.error {
+                    color: var(--error-color, #f44336);
+                }
+                .entity-notes-edit-controls {
+                    display: flex;
+                    justify-content: flex-start;
+                    align-items: center;
+                    margin-bottom: 4px;
+                    order: 0;
+                    flex-wrap: wrap;
+                    gap: 4px;
+                }
+                .entity-notes-edit-controls.hidden {
+                    display: none;
+                }
+                .entity-notes-persistent-toolbar {
+                    display: flex;
+                    gap: 4px;
+                    align-items: center;
+                }
+                .entity-notes-toolbar-separator {
+                    width: 1px;
+                    height: 20px;
+                    background-color: var(--divider-color, #e0e0e0);
+                    margin: 0 2px;
+                }
+                .entity-notes-markdown-toolbar {
+                    display: flex;
+                    justify-content: flex-start;
+                    align-items: center;
+                    gap: 4px;
+                    flex-wrap: wrap;
+                }
+                .entity-notes-markdown-toolbar.hidden {
+                    display: none;
+                }
+                .entity-notes-md-button {
+                    background: var(--secondary-background-color, #f5f5f5);
+                    color: var(--primary-text-color, black);
+                    border: 1px solid var(--divider-color, #e0e0e0);
+                    border-radius: 4px;
+                    padding: 2px;
+                    cursor: pointer;
+                    font-size: 12px;
+                    width: 28px;
+                    height: 28px;
+                    display: flex;
+                    align-items: center;
+                    justify-content: center;
+                    line-height: 1;
+                }
+                .entity-notes-md-button:hover {
+                    background: var(--divider-color, #e0e0e0);
+                }
+                .entity-notes-md-button:disabled {
+                    opacity: 0.5;
+                    cursor: not-allowed;
+                }
+                .entity-notes-md-button b {
+                    font-size: 14px;
+                }
+                .entity-notes-md-button i {
+                    font-size: 14px;
+                }
+            </style>
+            <div class="entity-notes-container">
+                <div class="entity-notes-view hidden"></div>
+                <div class="entity-notes-edit-controls hidden">
+                    <div class="entity-notes-persistent-toolbar">
+                        ${previewButtonHtml}
+                    </div>
+                    <div class="entity-notes-markdown-toolbar hidden">
+                    <button class="entity-notes-md-button" data-action="undo" title="${localize('toolbar_undo')}" disabled>↩</button>
+                    <button class="entity-notes-md-button" data-action="redo" title="${localize('toolbar_redo')}" disabled>↪</button>
+                    <div class="entity-notes-toolbar-separator"></div>
+                    <button class="entity-notes-md-button" data-format="h1" title="${localize('toolbar_heading1')}">H1</button>
+                    <button class="entity-notes-md-button" data-format="h2" title="${localize('toolbar_heading2')}">H2</button>
+                    <button class="entity-notes-md-button" data-format="bold" title="${localize('toolbar_bold')}"><b>B</b></button>
+                    <button class="entity-notes-md-button" data-format="italic" title="${localize('toolbar_italic')}"><i>I</i></button>
+                    <button class="entity-notes-md-button" data-format="ul" title="${localize('toolbar_bullet_list')}">&bull;</button>
+                    <button class="entity-notes-md-button" data-format="ol" title="${localize('toolbar_numbered_list')}">1.</button>
+                    <button class="entity-notes-md-button" data-format="hr" title="${localize('toolbar_divider')}">&mdash;</button>
+                    <div class="entity-notes-toolbar-separator"></div>
+                    <button class="entity-notes-md-button" data-format="inline-code" title="${localize('toolbar_inline_code')}">\`</button>
+                    <button class="entity-notes-md-button" data-format="code-block" title="${localize('toolbar_code_block')}">\`\`\`</button>
+                    <button class="entity-notes-md-button" data-format="link" title="${localize('toolbar_insert_link')}">🔗</button>
+                    <button class="entity-notes-md-button" data-format="blockquote" title="${localize('toolbar_blockquote')}">”</button>
+                    <button class="entity-notes-md-button" data-format="strikethrough" title="${localize('toolbar_strikethrough')}">~</button>
+                </div>
+                </div>
+                <textarea
+                    class="entity-notes-textarea hidden"
+                    placeholder="${initialPlaceholder}"
+                    maxlength="${maxLength}"
+                    rows="1"
+                ></textarea>
+                <div class="entity-notes-live-preview hidden"></div>
+                <div class="entity-notes-footer">
+                    <div class="entity-notes-timestamp hidden"></div>
+                    <div class="entity-notes-char-count">0/${maxLength}</div>
+                </div>
+                <div class="entity-notes-actions">
+                    <button class="entity-notes-button entity-notes-delete">${localize('delete')}</button>
+                    <button class="entity-notes-button entity-notes-save">${localize('save')}</button>
+                </div>
+            </div>
+        `;
+    }
+
+    renderMarkdown(text) {
+        const escapeHtml = (str) => str
+            .replace(/&/g, '&amp;')
+            .replace(/</g, '&lt;')
+            .replace(/>/g, '&gt;')
+            .replace(/"/g, '&quot;');
+
+        const renderSafeLink = (url, label) => {
+            let parsedUrl;
+            try {
+                parsedUrl = new URL(url.trim(), window.location.origin);
+            } catch (error) {
+                return escapeHtml(label);
+            }
+
+            const allowedProtocols = ['http:', 'https:', 'mailto:'];
+            if (!allowedProtocols.includes(parsedUrl.protocol)) {
+                return escapeHtml(label);
+            }
+
+            const safeUrl = escapeHtml(url);
+            return `<a href="${safeUrl}" target="_blank" rel="noopener noreferrer">${escapeHtml(label)}</a>`;
+        };
+
+        // Single-pass inline processor: finds the earliest pattern match,
+        // escapes the literal text before it, renders the match, then continues.
+        const processInline = (raw) => {
+            const inlinePatterns = [
+                { re: /\[([^\]]+)\]\(((?:[^()\s]+|\([^)]*\))+)\)/, render: (m) => renderSafeLink(m[2], m[1]) },
+                { re: /\*\*(.+?)\*\*/, render: (m) => `<strong>${escapeHtml(m[1])}</strong>` },
+                { re: /\*(.+?)\*/,     render: (m) => `<em>${escapeHtml(m[1])}</em>` },
+                { re: /`(.+?)`/,       render: (m) => `<code>${escapeHtml(m[1])}</code>` }, // Inline code
+                { re: /~(.+?)~/,       render: (m) => `<del>${escapeHtml(m[1])}</del>` }, // Strikethrough
+                { re: /https?:\/\/[^\s]+/, render: (m) => renderSafeLink(m[0], m[0]) },
+            ];
+
+            let result = '';
+            let remaining = raw;
+
+            while (remaining.length > 0) {
+                let best = null, bestIndex = Infinity, bestPattern = null;
+                for (const p of inlinePatterns) {
+                    const m = p.re.exec(remaining);
+                    if (m && m.index < bestIndex) {
+                        best = m; bestIndex = m.index; bestPattern = p;
+                    }
+                }
+
+                if (!best) {
+                    result += escapeHtml(remaining);
+                    break;
+                }
+
+                result += escapeHtml(remaining.slice(0, bestIndex));
+                result += bestPattern.render(best);
+                remaining = remaining.slice(bestIndex + best[0].length);
+            }
+
+            return result;
+        };
+
+        // Process block-level structure line by line
+        const lines = text.split('\n');
+        const parts = [];
+        let listType = null;
+        let inCodeBlock = false; // New state for code blocks
+        let inBlockquote = false; // New state for blockquotes
+
+        const flushList = () => {
+            if (listType) {
+                parts.push(`</${listType}>`);
+                listType = null;
+            }
+        };
+
+        for (let i = 0; i < lines.length; i++) {
+            const line = lines[i];
+            const trimmed = line.trim();
+
+            // Handle fenced code blocks
+            if (trimmed.startsWith('```')) {
+                flushList();
+                if (inCodeBlock) {
+                    parts.push('</code></pre>');
+                    inCodeBlock = false;
+                } else {
+                    parts.push('<pre><code>');
+                    inCodeBlock = true;
+                }
+                continue; // Skip further processing for fence lines
+            }
+
+            if (inCodeBlock) {
+                parts.push(escapeHtml(line) + '\n'); // Render content inside code block as-is, preserving newlines
+                continue;
+            }
+
+            const h1Match = /^#\s+(.+)$/.exec(trimmed);
+            const h2Match = /^##\s+(.+)$/.exec(trimmed);
+            const ulMatch = /^[-*]\s+(.+)$/.exec(trimmed);
+            const olMatch = /^\d+\.\s+(.+)$/.exec(trimmed);
+            const hrMatch = /^-{3,}$/.test(trimmed);
+
+            const blockquoteMatch = /^>\s*(.*)$/.exec(line); // Use 'line' not 'trimmed' to preserve leading spaces for blockquote content
+
+            if (blockquoteMatch) {
+                flushList();
+                if (!inBlockquote) {
+                    parts.push('<blockquote>');
+                    inBlockquote = true;
+                }
+                parts.push(`<p>${processInline(blockquoteMatch[1])}</p>`);
+            } else if (h2Match) {
+                flushList();
+                if (inBlockquote) { parts.push('</blockquote>'); inBlockquote = false; }
+                parts.push(`<h2>${processInline(h2Match[1])}</h2>`);
+            } else if (h1Match) {
+                flushList();
+                if (inBlockquote) { parts.push('</blockquote>'); inBlockquote = false; }
+                parts.push(`<h1>${processInline(h1Match[1])}</h1>`);
+            } else if (hrMatch) {
+                flushList();
+                if (inBlockquote) { parts.push('</blockquote>'); inBlockquote = false; }
+                parts.push('<hr>');
+            } else if (ulMatch) {
+                if (inBlockquote) { parts.push('</blockquote>'); inBlockquote = false; }
+                if (listType !== 'ul') { flushList(); parts.push('<ul>'); listType = 'ul'; } // Flush list if type changes
+                parts.push(`<li>${processInline(ulMatch[1])}</li>`);
+            } else if (olMatch) {
+                if (inBlockquote) { parts.push('</blockquote>'); inBlockquote = false; }
+                if (listType !== 'ol') { flushList(); parts.push('<ol>'); listType = 'ol'; } // Flush list if type changes
+                parts.push(`<li>${processInline(olMatch[1])}</li>`);
+            } else {
+                flushList();
+                if (inBlockquote) { parts.push('</blockquote>'); inBlockquote = false; }
+                if (trimmed === '') {
+                    if (i < lines.length - 1) parts.push('<br>');
+                } else {
+                    const isLast = i === lines.length - 1;
+                    parts.push(processInline(trimmed) + (isLast ? '' : '<br>'));
+                }
+            }
+        }
+
+        flushList();
+        if (inBlockquote) {
+            parts.push('</blockquote>');
+            inBlockquote = false;
+        }
+        return parts.join('');
+    }
+
+    updateUndoRedoButtons() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const undoBtn = this.shadowRoot.querySelector('[data-action="undo"]');
+        const redoBtn = this.shadowRoot.querySelector('[data-action="redo"]');
+        const previewBtn = this.shadowRoot.querySelector('[data-action="toggle-preview"]');
+
+        if (undoBtn) undoBtn.disabled = textarea.value === this.initialState;
+        if (redoBtn) redoBtn.disabled = this.redoState === null;
+
+        if (previewBtn) {
+            const isEmpty = textarea.value.trim().length === 0;
+            previewBtn.disabled = isEmpty;
+            
+            if (isEmpty && this.isPreviewVisible) {
+                this.togglePreview();
+            }
+        }
+    }
+
+    undo() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        if (textarea.value !== this.initialState) {
+            this.redoState = textarea.value; // Save current state for redo
+            textarea.value = this.initialState;
+            this.updateUndoRedoButtons();
+            this.triggerInputEvent(textarea);
+            debugLog('Entity Notes: Performed undo.');
+        }
+    }
+
+    redo() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        if (this.redoState !== null) {
+            textarea.value = this.redoState;
+            this.redoState = null;
+            this.updateUndoRedoButtons();
+            this.triggerInputEvent(textarea);
+            debugLog('Entity Notes: Performed redo.');
+        }
+    }
+
+    triggerInputEvent(element) {
+        // Trigger input event to update char count, resize, etc.
+        element.dispatchEvent(new Event('input', { bubbles: true, cancelable: true }));
+    }
+
+    formatTimestamp(unixTimestamp) {
+        if (!unixTimestamp) return '';
+        const date = new Date(unixTimestamp * 1000);
+        const formatter = new Intl.DateTimeFormat(navigator.language || 'en-US', {
+            year: 'numeric',
+            month: '2-digit',
+            day: '2-digit',
+            hour: '2-digit',
+            minute: '2-digit'
+        });
+        return formatter.format(date);
+    }
+
+    updateTimestampDisplay() {
+        const tsDiv = this.shadowRoot.querySelector('.entity-notes-timestamp');
+        if (window.entityNotes.hideLastModified) {
+            tsDiv.classList.add('hidden');
+            return;
+        }
+        if (this.updatedAt) {
+            tsDiv.textContent = `🕒 ${this.formatTimestamp(this.updatedAt)}`;
+            tsDiv.classList.remove('hidden');
+        } else {
+            tsDiv.classList.add('hidden');
+        }
+    }
+
+    formatText(format) {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const start = textarea.selectionStart;
+        const end = textarea.selectionEnd;
+        const selectedText = textarea.value.substring(start, end);
+
+        let newCursorPos = -1;
+
+        switch (format) {
+            case 'h1':
+            case 'h2':
+            case 'ul':
+            case 'ol': {
+                const lineStartPos = textarea.value.lastIndexOf('\n', start - 1) + 1;
+
+                // Find end of the line containing the selection end
+                let lineEndPos = textarea.value.indexOf('\n', end);
+                if (lineEndPos === -1) {
+                    lineEndPos = textarea.value.length;
+                }
+                // If selection ends on a newline, we should not include the next line in the block.
+                if (end > 0 && textarea.value[end - 1] === '\n' && end > lineStartPos) {
+                    lineEndPos = end - 1;
+                }
+
+                const originalBlock = textarea.value.substring(lineStartPos, lineEndPos);
+                const lines = originalBlock.split('\n');
+                let newBlock;
+
+                const prefix = { h1: '# ', h2: '## ', ul: '- ' }[format];
+                const otherPrefixesRegex = /^(# |## |- |\d+\. )/;
+
+                if (format === 'ol') {
+                    // Check if all non-empty lines are already numbered
+                    const allAreNumbered = lines.filter(l => l.trim() !== '').every(l => /^\d+\.\s/.test(l));
+                    if (allAreNumbered) {
+                        // If so, remove numbering
+                        newBlock = lines.map(l => l.replace(/^\d+\.\s/, '')).join('\n');
+                    } else {
+                        // Otherwise, add numbering
+                        let counter = 1;
+                        newBlock = lines.map(l => {
+                            if (l.trim() === '') return l; // Keep empty lines
+                            return `${counter++}. ${l.replace(otherPrefixesRegex, '')}`;
+                        }).join('\n');
+                    }
+                } else { // h1, h2, ul
+                    // Check if all non-empty lines have the prefix
+                    const allHavePrefix = lines.filter(l => l.trim() !== '').every(l => l.startsWith(prefix));
+                    if (allHavePrefix) {
+                        // If so, remove prefix
+                        newBlock = lines.map(l => l.startsWith(prefix) ? l.substring(prefix.length) : l).join('\n');
+                    } else {
+                        // Otherwise, add prefix (and remove any other)
+                        newBlock = lines.map(l => {
+                            if (l.trim() === '') return l; // Keep empty lines
+                            return prefix + l.replace(otherPrefixesRegex, '');
+                        }).join('\n');
+                    }
+                }
+
+                textarea.setRangeText(newBlock, lineStartPos, lineEndPos);
+                
+                // Adjust selection to cover the new block
+                const newEnd = lineStartPos + newBlock.length;
+                textarea.setSelectionRange(lineStartPos, newEnd);
+                break;
+            }
+            case 'bold':
+            case 'italic': {
+                const markers = { bold: '**', italic: '*' };
+                const marker = markers[format];
+                const replacement = marker + selectedText + marker;
+                textarea.setRangeText(replacement, start, end, 'select');
+
+                // Adjust cursor if no text was selected
+                if (start === end) {
+                    textarea.setSelectionRange(start + marker.length, start + marker.length);
+                }
+                break;
+            }
+            case 'hr': {
+                const value = textarea.value;
+                const textBefore = value.substring(0, start);
+                const needsNewlineBefore = start > 0 && textBefore.trim().length > 0 && !textBefore.endsWith('\n\n');
+                const prefixNewline = needsNewlineBefore ? (textBefore.endsWith('\n') ? '\n' : '\n\n') : '';
+
+                const textToInsert = prefixNewline + '---\n';
+                textarea.setRangeText(textToInsert, start, end);
+                newCursorPos = start + textToInsert.length;
+                break;
+            }
+            case 'inline-code': {
+                const marker = '`';
+                const replacement = marker + selectedText + marker;
+                textarea.setRangeText(replacement, start, end, 'select');
+                if (start === end) {
+                    textarea.setSelectionRange(start + marker.length, start + marker.length);
+                }
+                break;
+            }
+            case 'code-block': {
+                const marker = '```\n';
+                const closingMarker = '\n```';
+                let textToInsert;
+                let newCursorPos;
+
+                if (selectedText) {
+                    textToInsert = marker + selectedText + closingMarker;
+                    newCursorPos = start + marker.length; // Cursor at start of selected text in block
+                } else {
+                    textToInsert = marker + '\n' + closingMarker;
+                    newCursorPos = start + marker.length + 1; // Cursor on the empty line inside the block
+                }
+
+                textarea.setRangeText(textToInsert, start, end, 'end');
+                textarea.setSelectionRange(newCursorPos, newCursorPos);
+                break;
+            }
+            case 'link': {
+                const linkText = prompt(localize('prompt_link_text'), selectedText || '');
+                if (linkText === null) break; // User cancelled
+                const url = prompt(localize('prompt_link_url'), 'https://');
+                if (url === null) break; // User cancelled
+                
+                const linkMarkdown = `[${linkText}](${url})`;
+                
+                textarea.setRangeText(linkMarkdown, start, end, 'end');
+                newCursorPos = start + linkMarkdown.length; // Cursor after the closing parenthesis
+                textarea.setSelectionRange(newCursorPos, newCursorPos);
+                break;
+            }
+            case 'blockquote': {
+                const lineStartPos = textarea.value.lastIndexOf('\n', start - 1) + 1;
+                let lineEndPos = textarea.value.indexOf('\n', end);
+                if (lineEndPos === -1) {
+                    lineEndPos = textarea.value.length;
+                }
+                if (end > 0 && textarea.value[end - 1] === '\n' && end > lineStartPos) {
+                    lineEndPos = end - 1;
+                }
+
+                const originalBlock = textarea.value.substring(lineStartPos, lineEndPos);
+                const lines = originalBlock.split('\n');
+                const newBlock = lines.map(l => {
+                    if (l.startsWith('> ')) {
+                        return l.substring(2); // Remove blockquote
+                    } else {
+                        return '> ' + l; // Add blockquote
+                    }
+                }).join('\n');
+
+                textarea.setRangeText(newBlock, lineStartPos, lineEndPos);
+                const newEnd = lineStartPos + newBlock.length;
+                textarea.setSelectionRange(lineStartPos, newEnd);
+                break;
+            }
+            case 'strikethrough': {
+                const marker = '~';
+                const replacement = marker + selectedText + marker;
+                textarea.setRangeText(replacement, start, end, 'select');
+                if (start === end) {
+                    textarea.setSelectionRange(start + marker.length, start + marker.length);
+                }
+                break;
+            }
+        }
+
+        textarea.focus();
+        if (newCursorPos !== -1) {
+            textarea.setSelectionRange(newCursorPos, newCursorPos);
+        }
+
+        // Trigger input event to update char count etc.
+        textarea.dispatchEvent(new Event('input', { bubbles: true, cancelable: true }));
+    }
+
+    setupEventListeners() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const viewDiv = this.shadowRoot.querySelector('.entity-notes-view');
+        const charCount = this.shadowRoot.querySelector('.entity-notes-char-count');
+        const saveBtn = this.shadowRoot.querySelector('.entity-notes-save');
+        const deleteBtn = this.shadowRoot.querySelector('.entity-notes-delete');
+            const editControls = this.shadowRoot.querySelector('.entity-notes-edit-controls');
+        const markdownToolbar = this.shadowRoot.querySelector('.entity-notes-markdown-toolbar');
+
+            editControls.addEventListener('mousedown', (event) => {
+            const button = event.target.closest('.entity-notes-md-button');
+            if (button) {
+                event.preventDefault(); // Prevent textarea from losing focus
+            }
+        });
+
+            editControls.addEventListener('click', (event) => {
+            const button = event.target.closest('.entity-notes-md-button');
+            if (!button) return;
+
+            if (button.dataset.format) {
+                this.formatText(button.dataset.format);
+            } else if (button.dataset.action === 'undo') {
+                this.undo();
+            } else if (button.dataset.action === 'redo') {
+                this.redo();
+                } else if (button.dataset.action === 'toggle-preview') {
+                    this.togglePreview();
+            }
+        });
+
+        textarea.addEventListener('input', () => {
+            this.updateCharCount();
+            this.autoResize();
+            this.updateButtonVisibility();
+            this.updateUndoRedoButtons();
+                if (this.isPreviewVisible) {
+                    this.updateLivePreview();
+                }
+        });
+
+        textarea.addEventListener('keydown', (event) => {
+            if (event.ctrlKey || event.metaKey) { // metaKey for macOS
+                if (event.key.toLowerCase() === 'z') {
+                    event.preventDefault();
+                    this.undo();
+                } else if (event.key.toLowerCase() === 'y') {
+                    event.preventDefault();
+                    this.redo();
+                }
+            }
+        });
+
+        textarea.addEventListener('focus', () => {
+            if (window.entityNotes.hideMarkdownHints) {
+                textarea.placeholder = localize('markdown_hints');
+            }
+            this.autoResize();
+            this.updateCharCountVisibility();
+            this.updateButtonVisibility();
+            this.updateEditControlsVisibility();
+        });
+
+        textarea.addEventListener('blur', () => {
+            if (window.entityNotes.hideMarkdownHints) {
+                textarea.placeholder = emptyNotePlaceholder();
+            }
+            // When textarea loses focus, switch back to view mode if there's content
+            // Add a small delay to allow button clicks to register
+            setTimeout(() => {
+                if (!this.shadowRoot.activeElement) {
+                this.switchToViewMode();
+                }
+                this.updateCharCountVisibility();
+                this.updateButtonVisibility();
+                this.updateEditControlsVisibility();
+            }, 200);
+        });
+
+        viewDiv.addEventListener('click', (event) => {
+            // Don't switch to edit mode if clicking on a link or inside a link
+            // Check if the clicked element or any parent is a link
+            let element = event.target;
+            while (element && element !== viewDiv) {
+                if (element.tagName === 'A') {
+                    event.stopPropagation();
+                    return;
+                }
+                element = element.parentElement;
+            }
+
+            this.switchToEditMode();
+        });
+
+        // Fokus-Verlust des Textfeldes bei Klick auf "Speichern" und "Löschen" blockieren,
+        // da die Buttons sonst je nach Einstellung verschwinden, bevor der Klick ausgeführt wird.
+        saveBtn.addEventListener('mousedown', (e) => e.preventDefault());
+        deleteBtn.addEventListener('mousedown', (e) => e.preventDefault());
+
+        saveBtn.addEventListener('click', () => this.saveNote());
+        deleteBtn.addEventListener('click', () => this.deleteNote());
+    }
+
+        togglePreview() {
+            this.isPreviewVisible = !this.isPreviewVisible;
+            const previewDiv = this.shadowRoot.querySelector('.entity-notes-live-preview');
+            const previewBtn = this.shadowRoot.querySelector('[data-action="toggle-preview"]');
+
+            if (this.isPreviewVisible) {
+                previewDiv.classList.remove('hidden');
+                previewBtn.style.background = 'var(--primary-color, #03a9f4)';
+                previewBtn.style.color = 'white';
+                this.updateLivePreview();
+                debugLog('Entity Notes: Live preview enabled');
+            } else {
+                previewDiv.classList.add('hidden');
+                previewBtn.style.background = '';
+                previewBtn.style.color = '';
+                debugLog('Entity Notes: Live preview disabled');
+            }
+        }
+
+        updateLivePreview() {
+            const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+            const previewDiv = this.shadowRoot.querySelector('.entity-notes-live-preview');
+            const text = textarea.value.trim();
+
+            if (text.length === 0) {
+                previewDiv.innerHTML = `<em style="color: var(--secondary-text-color, #666);">${localize('preview_empty')}</em>`;
+            return;
+        }
+        
+        // If unchanged from initial state, use the already resolved Jinja2 template
+        if (text === (this.initialState ? this.initialState.trim() : '') && this.renderedNote) {
+            previewDiv.innerHTML = this.renderMarkdown(this.renderedNote);
+            return;
+        }
+
+        // Live Jinja2 Rendering: Ask the backend to render if we detect template tags
+        if (text.includes('{{') || text.includes('{%')) {
+            // Immediately show unrendered text so typing doesn't feel sluggish
+            previewDiv.innerHTML = this.renderMarkdown(text);
+            
+            // Clear any existing timeout
+            if (this.previewDebounceTimer) {
+                clearTimeout(this.previewDebounceTimer);
+            }
+            
+            // Wait 500ms after the user stops typing to ping the backend
+            this.previewDebounceTimer = setTimeout(async () => {
+                const itemId = this.getAttribute('entity-id') || this.getAttribute('device-id');
+                const type = this.getAttribute('type') || 'entity';
+                
+                try {
+                    const response = await this.authenticatedFetch('/api/entity_notes/render', {
+                        method: 'POST',
+                        body: JSON.stringify({ 
+                            note: text,
+                            entity_id: type === 'entity' ? itemId : undefined,
+                            device_id: type === 'device' ? itemId : undefined,
+                            user_name: this.currentUserName
+                        })
+                    });
+                    
+                    if (response.ok) {
+                        const result = await response.json();
+                        // Double-check the user hasn't typed more while we were waiting
+                        if (textarea.value.trim() === text) {
+                            previewDiv.innerHTML = this.renderMarkdown(result.rendered_note || text);
+                        }
+                    }
+                } catch (error) {
+                    debugLog('Entity Notes: Failed to fetch live render: ' + error);
+                }
+            }, 500);
+        } else {
+            // Regular Markdown renders instantly
+            previewDiv.innerHTML = this.renderMarkdown(text);
+            }
+        }
+
+    hasTextareaFocus() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        return document.activeElement === textarea || this.shadowRoot.activeElement === textarea;
+    }
+
+    updateEditControlsVisibility() {
+        const editControls = this.shadowRoot.querySelector('.entity-notes-edit-controls');
+        const markdownToolbar = this.shadowRoot.querySelector('.entity-notes-markdown-toolbar');
+
+        const shouldShowMarkdownToolbar = window.entityNotes.showMarkdownToolbar === true ||
+            window.entityNotes.showMarkdownToolbar === 'true';
+        const shouldHideUntilFocus = window.entityNotes.hideMarkdownHints === true ||
+            window.entityNotes.hideMarkdownHints === 'true';
+        const shouldShowEditControls = !shouldHideUntilFocus || this.hasTextareaFocus();
+
+        editControls.classList.toggle('hidden', !shouldShowEditControls);
+        markdownToolbar.classList.toggle('hidden', !shouldShowEditControls || !shouldShowMarkdownToolbar);
+    }
+
+    updateButtonVisibility() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const actions = this.shadowRoot.querySelector('.entity-notes-actions');
+        const currentText = textarea.value.trim();
+
+        // NEW LOGIC: Check if hide-until-focus mode is enabled
+        if (window.entityNotes.hideButtonsUntilFocus) {
+            // In hide-until-focus mode, only show buttons when textarea has focus
+            const hasFocus = this.hasTextareaFocus();
+
+            if (hasFocus) {
+                actions.classList.remove('hidden');
+                debugLog('Entity Notes: Showing buttons (textarea has focus)');
+            } else {
+                actions.classList.add('hidden');
+                debugLog('Entity Notes: Hiding buttons (textarea lost focus)');
+            }
+            return; // Exit early, don't apply other visibility logic
+        }
+
+        // EXISTING LOGIC: Original hide-when-empty behavior
+        if (!window.entityNotes.hideButtonsWhenEmpty) {
+            debugLog('Entity Notes: Always showing buttons (hideButtonsWhenEmpty is false)');
+            return;
+        }
+
+        // Show buttons if there's text OR if there's an existing note
+        const shouldShowButtons = currentText.length > 0 || this.hasExistingNote;
+
+        if (shouldShowButtons) {
+            actions.classList.remove('hidden');
+            debugLog('Entity Notes: Showing buttons (has text or existing note)');
+        } else {
+            actions.classList.add('hidden');
+            debugLog('Entity Notes: Hiding buttons (no text and no existing note)');
+        }
+    }
+
+    updateCharCount() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const charCount = this.shadowRoot.querySelector('.entity-notes-char-count');
+        const count = textarea.value.length;
+        const maxLength = window.entityNotes.maxNoteLength;
+
+        charCount.textContent = `${count}/${maxLength}`;
+
+        charCount.classList.remove('warning', 'error');
+        if (count > maxLength * 0.9) charCount.classList.add('warning');
+        if (count >= maxLength) charCount.classList.add('error');
+        this.updateCharCountVisibility();
+    }
+
+    updateCharCountVisibility() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const charCount = this.shadowRoot.querySelector('.entity-notes-char-count');
+        if (!textarea || !charCount) return;
+
+        const hideUntilFocus = window.entityNotes.hideCharCountUntilFocus === true ||
+            window.entityNotes.hideCharCountUntilFocus === 'true';
+        const isTextareaVisible = !textarea.classList.contains('hidden');
+        const shouldShow = isTextareaVisible && (!hideUntilFocus || this.hasTextareaFocus());
+
+        charCount.style.display = shouldShow ? 'block' : 'none';
+    }
+
+    autoResize() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        textarea.style.height = 'auto';
+        const newHeight = Math.max(40, Math.min(300, textarea.scrollHeight));
+        textarea.style.height = newHeight + 'px';
+    }
+
+    switchToEditMode() {
+        this.isEditing = true;
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const viewDiv = this.shadowRoot.querySelector('.entity-notes-view');
+        const charCount = this.shadowRoot.querySelector('.entity-notes-char-count');
+        this.initialState = textarea.value;
+        this.redoState = null;
+        this.updateUndoRedoButtons();
+
+        viewDiv.classList.add('hidden');
+        textarea.classList.remove('hidden');
+        this.updateCharCountVisibility();
+        
+        this.updateEditControlsVisibility();
+
+            if (this.isPreviewVisible) {
+                this.shadowRoot.querySelector('.entity-notes-live-preview').classList.remove('hidden');
+                this.updateLivePreview();
+            }
+
+        // Focus the textarea
+        setTimeout(() => {
+            textarea.focus();
+            this.autoResize();
+            this.updateEditControlsVisibility();
+        }, 10);
+
+        debugLog('Entity Notes: Switched to edit mode');
+    }
+
+    switchToViewMode() {
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const viewDiv = this.shadowRoot.querySelector('.entity-notes-view');
+        const charCount = this.shadowRoot.querySelector('.entity-notes-char-count');
+        const markdownToolbar = this.shadowRoot.querySelector('.entity-notes-markdown-toolbar');
+        const noteText = textarea.value.trim();
+
+        // Only switch to view mode if there's content and we're not actively editing
+        if (noteText.length > 0 && this.isEditing) {
+            this.isEditing = false;
+
+            // Convert links to clickable format, use rendered Jinja2 template if unchanged
+            const textToRender = (noteText === (this.initialState ? this.initialState.trim() : '') && this.renderedNote) ? this.renderedNote : noteText;
+            viewDiv.innerHTML = this.renderMarkdown(textToRender);
+
+            viewDiv.classList.remove('hidden');
+            textarea.classList.add('hidden');
+            charCount.style.display = 'none';
+            markdownToolbar.classList.add('hidden');
+                this.shadowRoot.querySelector('.entity-notes-edit-controls').classList.add('hidden');
+
+                // Hide preview when in view mode
+                const previewDiv = this.shadowRoot.querySelector('.entity-notes-live-preview');
+                if (previewDiv) previewDiv.classList.add('hidden');
+
+            debugLog('Entity Notes: Switched to view mode');
+        } else if (noteText.length === 0) {
+            // If empty, stay in edit mode (or show placeholder)
+            this.isEditing = false;
+        }
+    }
+
+    async loadNote() {
+        const itemId = this.getAttribute('entity-id') || this.getAttribute('device-id');
+        const type = this.getAttribute('type') || 'entity';
+        const apiPath = type === 'device' ? 'device_notes' : 'entity_notes';
+
+        debugLog(`Entity Notes: Loading note for ${type} ${itemId}`);
+        if (!itemId) return;
+
+        try {
+            const userName = this.currentUserName;
+            const cacheKey = noteCacheKey(type, itemId);
+            const cached = noteCache.get(cacheKey);
+            const usable = cached && cached.userName === userName ? cached : null;
+            if (usable) {
+                this.showNote(usable.data);
+                debugLog(`Entity Notes: Showing cached note for ${type} ${itemId}`);
+            }
+
+            const headers = usable && usable.etag ? { 'If-None-Match': usable.etag } : {};
+            const response = await this.authenticatedFetch(
+                `/api/${apiPath}/${itemId}?user=${encodeURIComponent(userName)}`,
+                { headers, cache: 'no-store' }
+            );
+            if (response.status === 304) {
+                debugLog(`Entity Notes: Cached note for ${type} ${itemId} is current`);
+                return;
+            }
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const data = await response.json();
+            noteCache.set(cacheKey, { data, userName, etag: response.headers.get('ETag') });
+
+            // Do not replace text the user started editing while we revalidated
+            if (usable && this.isEditing) return;
+            this.showNote(data);
+        } catch (error) {
+            console.error(`Entity Notes: Error loading note for ${type}:`, error);
+            const viewDiv = this.shadowRoot.querySelector('.entity-notes-view');
+            viewDiv.innerHTML = `<em style="color: var(--error-color, #f44336);">${localize('error_loading_note')}</em>`;
+            viewDiv.classList.remove('hidden');
+        }
+    }
+
+    showNote(data) {
+        const type = this.getAttribute('type') || 'entity';
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const viewDiv = this.shadowRoot.querySelector('.entity-notes-view');
+        const markdownToolbar = this.shadowRoot.querySelector('.entity-notes-markdown-toolbar');
+        const noteText = data.note || '';
+        textarea.value = noteText;
+        this.renderedNote = data.rendered_note || noteText;
+
+        this.updatedAt = data.updated_at || null;
+        this.updateTimestampDisplay();
+
+        // Track if there's an existing note
+        this.hasExistingNote = noteText.length > 0;
+
+        this.initialState = noteText;
+        this.redoState = null;
+
+        this.updateCharCount();
+        this.updateButtonVisibility();
+        setTimeout(() => this.autoResize(), 10);
+
+        // Show in view mode if there's a note, edit mode if empty
+        if (noteText.length > 0) {
+            viewDiv.innerHTML = this.renderMarkdown(this.renderedNote);
+            viewDiv.classList.remove('hidden');
+            textarea.classList.add('hidden');
+            markdownToolbar.classList.add('hidden');
+            this.shadowRoot.querySelector('.entity-notes-edit-controls').classList.add('hidden');
+            this.shadowRoot.querySelector('.entity-notes-char-count').style.display = 'none';
+            this.isEditing = false;
+        } else {
+            viewDiv.classList.add('hidden');
+            textarea.classList.remove('hidden');
+            
+            this.updateEditControlsVisibility();
+            this.updateCharCountVisibility();
+            
+            this.isEditing = false;
+            this.updateUndoRedoButtons();
+        }
+
+        debugLog(`Entity Notes: Note loaded for ${type}, hasExistingNote: ${this.hasExistingNote}`);
+    }
+
+    async saveNote() {
+        const itemId = this.getAttribute('entity-id') || this.getAttribute('device-id');
+        const type = this.getAttribute('type') || 'entity';
+        const apiPath = type === 'device' ? 'device_notes' : 'entity_notes';
+        const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+        const note = textarea.value.trim();
+
+        debugLog(`Entity Notes: Saving note for ${type} ${itemId}: ${note}`);
+
+        try {
+            const response = await this.authenticatedFetch(`/api/${apiPath}/${itemId}`, {
+                method: 'POST',
+                body: JSON.stringify({ 
+                    note,
+                    user_name: this.currentUserName
+                })
+            });
+
+            if (response.ok) {
+                const result = await response.json();
+                this.updatedAt = result.updated_at || Math.floor(Date.now() / 1000);
+                this.renderedNote = result.rendered_note || note;
+                this.initialState = note; // Update initial state so it matches the newly saved note
+                this.updateTimestampDisplay();
+                // No ETag for the saved note yet, so the next load revalidates it in full
+                noteCache.set(noteCacheKey(type, itemId), {
+                    data: { note, rendered_note: this.renderedNote, updated_at: this.updatedAt },
+                    userName: this.currentUserName,
+                    etag: null,
+                });
+
+                // Update the existing note status
+                this.hasExistingNote = note.length > 0;
+                this.updateButtonVisibility();
+
+                // Switch to view mode after saving if there's content
+                if (note.length > 0) {
+                    this.isEditing = true; // Set to true so switchToViewMode will work
+                    this.switchToViewMode();
+                }
+
+                debugLog(`Entity Notes: Note saved successfully for ${type}, hasExistingNote: ${this.hasExistingNote}`);
+            } else {
+                console.error(`Entity Notes: Save failed for ${type} - HTTP ${response.status}`);
+                alert(`Entity Notes: Save failed (HTTP ${response.status}). Your session might have expired. Please reload the page.`);
+            }
+        } catch (error) {
+            console.error(`Entity Notes: Error saving note for ${type}:`, error);
+            alert(`Entity Notes: Connection error during save. Please check your network connection.`);
+        }
+    }
+
+    async deleteNote() {
+        const itemId = this.getAttribute('entity-id') || this.getAttribute('device-id');
+        const type = this.getAttribute('type') || 'entity';
+        const apiPath = type === 'device' ? 'device_notes' : 'entity_notes';
+
+        // New confirmation logic
+        if (window.entityNotes.confirmDelete === true || window.entityNotes.confirmDelete === 'true') {
+            if (!confirm(localize('confirm_delete', { type, item_id: itemId }))) {
+                debugLog(`Entity Notes: Delete cancelled for ${type} ${itemId}`); // User cancelled deletion
+                return;
+            }
+        }
+
+        debugLog(`Entity Notes: Deleting note for ${type} ${itemId}`);
+
+        try {
+            const response = await this.authenticatedFetch(`/api/${apiPath}/${itemId}`, {
+                method: 'DELETE'
+            });
+
+            if (response.ok) {
+                const textarea = this.shadowRoot.querySelector('.entity-notes-textarea');
+                const viewDiv = this.shadowRoot.querySelector('.entity-notes-view');
+
+                textarea.value = '';
+                viewDiv.innerHTML = '';
+                
+                this.updatedAt = null;
+                this.updateTimestampDisplay();
+                noteCache.set(noteCacheKey(type, itemId), {
+                    data: { note: '', rendered_note: '', updated_at: null },
+                    userName: this.currentUserName,
+                    etag: null,
+                });
+                
+                // Ensure we return to empty edit mode cleanly
+                viewDiv.classList.add('hidden');
+                textarea.classList.remove('hidden');
+                this.updateCharCountVisibility();
+                this.isEditing = true;
+                
+                this.updateEditControlsVisibility();
+                
+                this.hasExistingNote = false;
+
+                this.updateCharCount();
+                this.updateButtonVisibility();
+                this.updateUndoRedoButtons();
+                this.autoResize();
+                debugLog(`Entity Notes: Note deleted successfully for ${type}`);
+            } else {
+                console.error(`Entity Notes: Delete failed for ${type} - HTTP ${response.status}`);
+                alert(`Entity Notes: Delete failed (HTTP ${response.status}). Your session might have expired. Please reload the page.`);
+            }
+        } catch (error) {
+            console.error(`Entity Notes: Error deleting note for ${type}:`, error);
+            alert(`Entity Notes: Connection error during delete. Please check your network connection.`);
+        }
+    }
+}
+
+// Register the custom element
+if (!customElements.get('entity-notes-card')) {
+    customElements.define('entity-notes-card', EntityNotesCard);
+    infoLog('Entity Notes: Integration loaded successfully');
+}
+
+// Store reference for debugging
+window.entityNotes.EntityNotesCard = EntityNotesCard;
@@ -0,0 +1,136 @@
+"""Frontend bundle for Entity Notes."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import gzip
+import hashlib
+import json
+import logging
+from pathlib import Path
+import re
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+from .const import (
+    CONF_DEBUG_LOGGING,
+    CONF_MAX_NOTE_LENGTH,
+    CONF_HIDE_BUTTONS_WHEN_EMPTY,
+    CONF_HIDE_BUTTONS_UNTIL_FOCUS,
+    CONF_HIDE_CHAR_COUNT_UNTIL_FOCUS,
+    CONF_ENABLE_DEVICE_NOTES,
+    CONF_HIDE_MARKDOWN_TOOLBAR,
+    CONF_CONFIRM_DELETE,
+    CONF_HIDE_PREVIEW_BUTTON,
+    CONF_HIDE_MARKDOWN_HINTS,
+    CONF_EMPTY_NOTE_PLACEHOLDER,
+    CONF_HIDE_LAST_MODIFIED,
+    DEFAULT_HIDE_MARKDOWN_TOOLBAR,
+    FRONTEND_EDITOR_JS_PATH,
+    FRONTEND_JS_PATH,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Z_]+)\}\}")
+
+JS_URL = "/api/entity_notes/entity-notes.js"
+VERSIONED_JS_URL = "/api/entity_notes/js/{version}/{filename}"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@dataclass(slots=True)
+class FrontendBundle:
+    """The config-substituted script with precompressed variants."""
+
+    body: bytes
+    gzip: bytes
+    brotli: bytes | None
+    etag: str
+
+    @property
+    def version(self) -> str:
+        """Return the content hash used in the bundle's immutable URL."""
+        return self.etag.strip('"')
+
+    def encoded(self, accept_encoding: str) -> tuple[bytes, str | None]:
+        """Return the best body for the client's Accept-Encoding and its encoding."""
+        if self.brotli is not None and "br" in accept_encoding:
+            return self.brotli, "br"
+        if "gzip" in accept_encoding:
+            return self.gzip, "gzip"
+        return self.body, None
+
+
+def _js_bool(value: Any) -> str:
+    """Format a Python value as a JavaScript boolean literal."""
+    return str(bool(value)).lower()
+
+
+def _bundle_replacements(config: dict[str, Any]) -> dict[str, str]:
+    """Return the values substituted for the {{PLACEHOLDER}}s in the script."""
+    hide_markdown_toolbar = config.get(CONF_HIDE_MARKDOWN_TOOLBAR, DEFAULT_HIDE_MARKDOWN_TOOLBAR)
+    return {
+        "DEBUG_LOGGING": _js_bool(config.get(CONF_DEBUG_LOGGING, False)),
+        "MAX_NOTE_LENGTH": str(config.get(CONF_MAX_NOTE_LENGTH, 200)),
+        "HIDE_BUTTONS_WHEN_EMPTY": _js_bool(config.get(CONF_HIDE_BUTTONS_WHEN_EMPTY, False)),
+        "HIDE_BUTTONS_UNTIL_FOCUS": _js_bool(config.get(CONF_HIDE_BUTTONS_UNTIL_FOCUS, False)),
+        "HIDE_CHAR_COUNT_UNTIL_FOCUS": _js_bool(config.get(CONF_HIDE_CHAR_COUNT_UNTIL_FOCUS, False)),
+        "ENABLE_DEVICE_NOTES": _js_bool(config.get(CONF_ENABLE_DEVICE_NOTES, True)),
+        "CONFIRM_DELETE": _js_bool(config.get(CONF_CONFIRM_DELETE, True)),
+        "SHOW_MARKDOWN_TOOLBAR": _js_bool(not hide_markdown_toolbar),
+        "HIDE_PREVIEW_BUTTON": _js_bool(config.get(CONF_HIDE_PREVIEW_BUTTON, False)),
+        "HIDE_MARKDOWN_HINTS": _js_bool(config.get(CONF_HIDE_MARKDOWN_HINTS, False)),
+        "EMPTY_NOTE_PLACEHOLDER": json.dumps(config.get(CONF_EMPTY_NOTE_PLACEHOLDER, "")),
+        "HIDE_LAST_MODIFIED": _js_bool(config.get(CONF_HIDE_LAST_MODIFIED, False)),
+    }
+
+
+def _build_bundle(js_file_path: Path, replacements: dict[str, str]) -> FrontendBundle:
+    """Read, substitute and compress the script. Runs in the executor."""
+    source = js_file_path.read_text(encoding="utf-8")
+    text = PLACEHOLDER_PATTERN.sub(
+        lambda match: replacements.get(match.group(1), match.group(0)), source
+    )
+    body = text.encode("utf-8")
+    return FrontendBundle(
+        body=body,
+        gzip=gzip.compress(body, compresslevel=9),
+        brotli=brotli.compress(body) if brotli is not None else None,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:16]}"',
+    )
+
+
+def versioned_url(bundle: FrontendBundle, filename: str) -> str:
+    """Return the content-hashed URL of a bundle."""
+    return VERSIONED_JS_URL.format(version=bundle.version, filename=filename)
+
+
+async def async_build_bundles(hass: HomeAssistant, config: dict[str, Any]) -> dict[str, FrontendBundle]:
+    """Build the loader and editor bundles for the current configuration.
+
+    The editor is built first because the loader embeds the editor's
+    content-hashed URL, so a new editor also produces a new loader hash.
+    """
+    frontend_dir = Path(__file__).parent
+    replacements = _bundle_replacements(config)
+    bundles = {}
+    for filename in (FRONTEND_EDITOR_JS_PATH, FRONTEND_JS_PATH):
+        bundle = await hass.async_add_executor_job(_build_bundle, frontend_dir / filename, replacements)
+        _LOGGER.debug(
+            "Built frontend bundle %s %s: %d bytes, %d gzip, %s brotli",
+            filename,
+            bundle.etag,
+            len(bundle.body),
+            len(bundle.gzip),
+            len(bundle.brotli) if bundle.brotli is not None else "no",
+        )
+        bundles[filename] = bundle
+        if filename == FRONTEND_EDITOR_JS_PATH:
+            replacements["EDITOR_URL"] = json.dumps(versioned_url(bundle, filename))
+    return bundles
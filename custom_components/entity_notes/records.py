@@ -0,0 +1,100 @@
+"""Compact in-memory note records for Entity Notes."""
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+import sys
+from typing import Any
+import zlib
+
+from .const import COMPRESS_MIN_LENGTH
+
+
+@dataclass(slots=True)
+class NoteRecord:
+    """The text of a note and when it was last updated.
+
+    Stored notes are normalized into records once, when they are loaded, so
+    reads never have to handle the older bare-string notes. Records are
+    replaced rather than changed, which lets a snapshot taken for writing
+    share them with the live notes.
+    """
+
+    text: str
+    updated_at: int | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the note in its stored form."""
+        return {"text": self.text, "updated_at": self.updated_at}
+
+
+@dataclass(slots=True)
+class CompressedNoteRecord:
+    """A long note kept as base64-encoded zlib data, in memory and on disk.
+
+    The text is only decompressed when it is read. The encoded form is kept
+    rather than raw bytes so the record is written to the store as it is.
+    """
+
+    ztext: str
+    updated_at: int | None = None
+
+    @property
+    def text(self) -> str:
+        """Return the decompressed note text."""
+        return _decompress(self.ztext)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the note in its stored form."""
+        return {"ztext": self.ztext, "updated_at": self.updated_at}
+
+
+# Stands in for a note that does not exist
+EMPTY_NOTE = NoteRecord("")
+
+
+def _compress(text: str) -> str:
+    """Return text as base64-encoded zlib data."""
+    return base64.b64encode(zlib.compress(text.encode("utf-8"))).decode("ascii")
+
+
+def _decompress(ztext: str) -> str:
+    """Return the text of base64-encoded zlib data."""
+    return zlib.decompress(base64.b64decode(ztext)).decode("utf-8")
+
+
+def note_record(text: str, updated_at: int | None = None, compress: bool = False) -> NoteRecord | CompressedNoteRecord:
+    """Return the record for a note, compressing long text if compress is set and it helps."""
+    if compress and len(text) >= COMPRESS_MIN_LENGTH:
+        ztext = _compress(text)
+        if len(ztext) < len(text.encode("utf-8")):
+            return CompressedNoteRecord(ztext, updated_at)
+    return NoteRecord(text, updated_at)
+
+
+def load_note(raw_note: Any, compress: bool = False) -> NoteRecord | CompressedNoteRecord:
+    """Return the record for a stored note in the form the compress option asks for.
+
+    Notes saved before update times were recorded are bare strings.
+    """
+    if not isinstance(raw_note, dict):
+        return note_record(raw_note, None, compress)
+    updated_at = raw_note.get("updated_at")
+    if "ztext" not in raw_note:
+        return note_record(raw_note.get("text", ""), updated_at, compress)
+    if compress:
+        return CompressedNoteRecord(raw_note["ztext"], updated_at)
+    return NoteRecord(_decompress(raw_note["ztext"]), updated_at)
+
+
+def load_notes(raw_notes: dict[str, Any], compress: bool = False) -> dict[str, NoteRecord | CompressedNoteRecord]:
+    """Normalize stored notes into records keyed by interned ids."""
+    return {
+        sys.intern(item_id): load_note(raw_note, compress)
+        for item_id, raw_note in raw_notes.items()
+    }
+
+
+def dump_notes(notes: dict[str, NoteRecord | CompressedNoteRecord]) -> dict[str, dict[str, Any]]:
+    """Return notes in their stored form."""
+    return {item_id: record.as_dict() for item_id, record in notes.items()}
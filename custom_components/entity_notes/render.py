@@ -0,0 +1,395 @@
+"""Template rendering for Entity Notes."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any, Callable
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback, split_entity_id
+from homeassistant.helpers import area_registry as ar
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.template import Template
+
+from .const import (
+    RENDER_CACHE_SIZE,
+    RENDER_COOLDOWN,
+    RENDER_STRIKES_BEFORE_COOLDOWN,
+    TEMPLATE_CACHE_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+TEMPLATE_MARKERS = ("{{", "{%", "{#")
+
+
+def is_template(note: str) -> bool:
+    """Return True if the note contains Jinja syntax and needs rendering."""
+    return any(marker in note for marker in TEMPLATE_MARKERS)
+
+
+class TemplateCache:
+    """Bounded LRU cache of compiled note templates keyed by note text."""
+
+    def __init__(self, hass: HomeAssistant, max_size: int = TEMPLATE_CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._max_size = max_size
+        self._templates: OrderedDict[str, Template] = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "plain_text": 0,
+        }
+
+    @callback
+    def async_get(self, note: str) -> Template:
+        """Return a compiled template for the note text."""
+        tpl = self._templates.get(note)
+        if tpl is not None:
+            self._templates.move_to_end(note)
+            self.stats["hits"] += 1
+            return tpl
+
+        self.stats["misses"] += 1
+        tpl = Template(note, self.hass)
+        # Compile now so syntax errors surface here and are not cached
+        tpl.ensure_valid()
+        self._templates[note] = tpl
+        if len(self._templates) > self._max_size:
+            self._templates.popitem(last=False)
+            self.stats["evictions"] += 1
+        return tpl
+
+    @callback
+    def async_invalidate(self, note: str | None) -> None:
+        """Drop the compiled template for a note text that is no longer stored."""
+        if note:
+            self._templates.pop(note, None)
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop all compiled templates."""
+        self._templates.clear()
+
+    @callback
+    def async_render(self, note: str, variables: dict[str, Any]) -> str:
+        """Render a note, skipping Jinja entirely for plain text."""
+        if not note or not is_template(note):
+            self.stats["plain_text"] += 1
+            return note
+        return str(self.async_get(note).async_render(variables, parse_result=False))
+
+    @property
+    def size(self) -> int:
+        """Return the number of cached templates."""
+        return len(self._templates)
+
+
+# (note_type, item_id, user_name)
+RenderKey = tuple[str, str, str]
+
+
+@dataclass(slots=True)
+class _SlowNote:
+    """Render budget bookkeeping for a note that rendered too slowly."""
+
+    strikes: int = 0
+    cooldown_until: float = 0.0
+    # The last slow render and the note text it was rendered from
+    note: str | None = None
+    rendered: str | None = None
+
+
+@dataclass(slots=True)
+class _RenderedNote:
+    """A rendered note and the states it was rendered from."""
+
+    note: str
+    rendered: str
+    entities: frozenset[str]
+    domains: frozenset[str]
+    all_states: bool
+
+
+class RenderCache:
+    """Rendered note output, invalidated when a state the render read changes.
+
+    Each render records the entities and domains it touched through Home
+    Assistant's template render info. A state change only invalidates the
+    renders that depend on it; editing a note invalidates that note's renders.
+    Templates that use the current time are never cached.
+
+    Renders are timed against ``budget_ms``. A note that goes over budget
+    repeatedly is put in a cooldown during which its last render (or its raw
+    text) is returned, and after the cooldown it is first test-rendered in a
+    worker thread so a still-slow template cannot stall the event loop.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        template_cache: TemplateCache,
+        budget_ms: int = 0,
+        max_size: int = RENDER_CACHE_SIZE,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._template_cache = template_cache
+        self._budget = budget_ms / 1000
+        self._max_size = max_size
+        self._slow: dict[tuple[str, str], _SlowNote] = {}
+        # Previews of unsaved text are tracked apart so they never affect the saved note
+        self._slow_previews: dict[tuple[str, str], _SlowNote] = {}
+        self._entries: OrderedDict[RenderKey, _RenderedNote] = OrderedDict()
+        self._by_note: dict[tuple[str, str], set[RenderKey]] = {}
+        self._by_entity: dict[str, set[RenderKey]] = {}
+        self._by_domain: dict[str, set[RenderKey]] = {}
+        self._all_states: set[RenderKey] = set()
+        self._unsubs: list[Callable[[], None]] = []
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "uncacheable": 0,
+            "slow_renders": 0,
+            "cooldown_skips": 0,
+        }
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening for the state and registry changes that invalidate renders."""
+        self._unsubs.append(
+            self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._async_state_changed,
+                event_filter=self._async_filter_state_changed,
+            )
+        )
+        # Registry lookups such as area_name() or device_attr() are not tracked
+        # per render; registry updates are rare, so they clear everything.
+        for event_type in (
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            dr.EVENT_DEVICE_REGISTRY_UPDATED,
+            ar.EVENT_AREA_REGISTRY_UPDATED,
+        ):
+            self._unsubs.append(self.hass.bus.async_listen(event_type, self._async_registry_updated))
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and drop all cached renders."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        self.async_clear()
+
+    @property
+    def size(self) -> int:
+        """Return the number of cached renders."""
+        return len(self._entries)
+
+    async def async_render(self, key: RenderKey, note: str, variables: dict[str, Any]) -> str:
+        """Return the rendered note, rendering only if a dependency changed."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.note == note:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.rendered
+
+        if not note or not is_template(note):
+            return self._template_cache.async_render(note, variables)
+
+        self.stats["misses"] += 1
+        self._remove(key)
+        info = await self._async_render_within_budget(key[:2], note, variables)
+        if info is None:
+            return self._fallback(key[:2], note)
+        rendered = str(info.result())
+
+        if info.has_time:
+            self.stats["uncacheable"] += 1
+            return rendered
+
+        self._add(key, _RenderedNote(
+            note=note,
+            rendered=rendered,
+            entities=frozenset(info.entities),
+            domains=frozenset(info.domains) | frozenset(info.domains_lifecycle),
+            all_states=info.all_states or info.all_states_lifecycle,
+        ))
+        return rendered
+
+    async def async_render_preview(
+        self, note_type: str, item_id: str, note: str, variables: dict[str, Any]
+    ) -> str:
+        """Render unsaved note text for the live preview, without caching it."""
+        if not note or not is_template(note):
+            return self._template_cache.async_render(note, variables)
+
+        info = await self._async_render_within_budget((note_type, item_id), note, variables, preview=True)
+        if info is None:
+            return note
+        return str(info.result())
+
+    async def _async_render_within_budget(
+        self, note_key: tuple[str, str], note: str, variables: dict[str, Any], preview: bool = False
+    ):
+        """Render a note and enforce the render budget.
+
+        Returns the render info, or None if the note is cooling down or would
+        not finish within the budget.
+        """
+        tpl = self._template_cache.async_get(note)
+        if not self._budget:
+            return tpl.async_render_to_info(variables, parse_result=False)
+
+        note_type, item_id = note_key
+        slow_notes = self._slow_previews if preview else self._slow
+        slow = slow_notes.get(note_key)
+        if slow is not None:
+            if time.monotonic() < slow.cooldown_until:
+                self.stats["cooldown_skips"] += 1
+                return None
+            if await tpl.async_render_will_timeout(self._budget, variables):
+                self._strike(note_key, slow, note, None, preview)
+                return None
+
+        start = time.perf_counter()
+        info = tpl.async_render_to_info(variables, parse_result=False)
+        elapsed = time.perf_counter() - start
+
+        if elapsed <= self._budget:
+            slow_notes.pop(note_key, None)
+            return info
+
+        self.stats["slow_renders"] += 1
+        _LOGGER.warning(
+            "Rendering the note %sfor %s %s took %.0f ms, over the %.0f ms render budget",
+            "preview " if preview else "",
+            note_type,
+            item_id,
+            elapsed * 1000,
+            self._budget * 1000,
+        )
+        self._strike(
+            note_key,
+            slow_notes.setdefault(note_key, _SlowNote()),
+            note,
+            None if info.exception else str(info.result()),
+            preview,
+        )
+        return info
+
+    def _strike(
+        self,
+        note_key: tuple[str, str],
+        slow: _SlowNote,
+        note: str,
+        rendered: str | None,
+        preview: bool = False,
+    ) -> None:
+        """Count a slow render and start a cooldown for repeat offenders."""
+        slow.strikes += 1
+        if rendered is not None:
+            slow.note = note
+            slow.rendered = rendered
+        if slow.strikes >= RENDER_STRIKES_BEFORE_COOLDOWN:
+            slow.cooldown_until = time.monotonic() + RENDER_COOLDOWN
+            _LOGGER.warning(
+                "Not rendering the note %sfor %s %s for %d seconds after %d slow renders",
+                "preview " if preview else "",
+                note_key[0],
+                note_key[1],
+                RENDER_COOLDOWN,
+                slow.strikes,
+            )
+
+    def _fallback(self, note_key: tuple[str, str], note: str) -> str:
+        """Return the last render of a slow note if its text is unchanged, or its raw text."""
+        slow = self._slow.get(note_key)
+        if slow is not None and slow.rendered is not None and slow.note == note:
+            return slow.rendered
+        return note
+
+    def _add(self, key: RenderKey, entry: _RenderedNote) -> None:
+        """Cache a render and index its dependencies."""
+        self._entries[key] = entry
+        self._by_note.setdefault(key[:2], set()).add(key)
+        for entity_id in entry.entities:
+            self._by_entity.setdefault(entity_id, set()).add(key)
+        for domain in entry.domains:
+            self._by_domain.setdefault(domain, set()).add(key)
+        if entry.all_states:
+            self._all_states.add(key)
+
+        if len(self._entries) > self._max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: RenderKey) -> None:
+        """Drop a render and its dependency index entries."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _discard(self._by_note, key[:2], key)
+        for entity_id in entry.entities:
+            _discard(self._by_entity, entity_id, key)
+        for domain in entry.domains:
+            _discard(self._by_domain, domain, key)
+        self._all_states.discard(key)
+
+    @callback
+    def async_invalidate_note(self, note_type: str, item_id: str) -> None:
+        """Drop the renders of a note that was edited or deleted."""
+        for key in list(self._by_note.get((note_type, item_id), ())):
+            self._remove(key)
+        # An edit may have fixed a slow template, so give it a fresh start
+        self._slow.pop((note_type, item_id), None)
+        self._slow_previews.pop((note_type, item_id), None)
+
+    @callback
+    def async_clear(self) -> None:
+        """Drop all cached renders."""
+        self._entries.clear()
+        self._by_note.clear()
+        self._by_entity.clear()
+        self._by_domain.clear()
+        self._all_states.clear()
+
+    @callback
+    def _async_filter_state_changed(self, event_data: dict[str, Any]) -> bool:
+        """Only pass state changes that some cached render depends on."""
+        if self._all_states:
+            return True
+        entity_id = event_data["entity_id"]
+        if entity_id in self._by_entity:
+            return True
+        return bool(self._by_domain) and split_entity_id(entity_id)[0] in self._by_domain
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Invalidate the renders that read the changed state."""
+        entity_id = event.data["entity_id"]
+        keys = set(self._all_states)
+        keys.update(self._by_entity.get(entity_id, ()))
+        keys.update(self._by_domain.get(split_entity_id(entity_id)[0], ()))
+        for key in keys:
+            self._remove(key)
+        self.stats["invalidations"] += len(keys)
+
+    @callback
+    def _async_registry_updated(self, _event: Event) -> None:
+        """Drop all renders after a registry change."""
+        self.stats["invalidations"] += len(self._entries)
+        self.async_clear()
+
+
+def _discard(index: dict[Any, set[RenderKey]], dependency: Any, key: RenderKey) -> None:
+    """Remove a key from a dependency index, dropping empty buckets."""
+    keys = index.get(dependency)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[dependency]
@@ -0,0 +1,230 @@
+"""Search and query indexes for Entity Notes."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Iterable
+import math
+import re
+
+# (note_type, item_id)
+NoteKey = tuple[str, str]
+
+_MISSING = object()
+# Sorts after every other character, to end a prefix range in a sorted id list
+MAX_CHAR = "\U0010ffff"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+PREFIX_MATCH_WEIGHT = 0.5  # a prefix match scores half of a whole-word match
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case word tokens."""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+class NoteSearchIndex:
+    """In-memory inverted index over note text.
+
+    Every term maps to the notes containing it and how often. A sorted term
+    list finds prefix matches with a binary search, so a query only touches
+    the postings of the terms it matches rather than every note. A note
+    matches when it contains all query words, either whole or, with prefix
+    matching, as the start of a longer word. Results are ranked by TF-IDF.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._postings: dict[str, dict[NoteKey, int]] = {}
+        self._terms: list[str] = []
+        self._note_terms: dict[NoteKey, Counter[str]] = {}
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return the size of the index."""
+        return {"notes": len(self._note_terms), "terms": len(self._terms)}
+
+    def rebuild(self, notes: Iterable[tuple[str, str, str]]) -> None:
+        """Replace the index with (note_type, item_id, text) entries."""
+        self._postings.clear()
+        self._note_terms.clear()
+        for note_type, item_id, text in notes:
+            counts = Counter(tokenize(text))
+            if not counts:
+                continue
+            key = (note_type, item_id)
+            self._note_terms[key] = counts
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[key] = count
+        self._terms = sorted(self._postings)
+
+    def update(self, note_type: str, item_id: str, text: str) -> None:
+        """Index the current text of a note; empty text removes it."""
+        key = (note_type, item_id)
+        counts = Counter(tokenize(text))
+        old_counts = self._note_terms.pop(key, None)
+        if old_counts is not None:
+            for term in old_counts.keys() - counts.keys():
+                postings = self._postings[term]
+                del postings[key]
+                if not postings:
+                    del self._postings[term]
+                    del self._terms[bisect_left(self._terms, term)]
+        if not counts:
+            return
+
+        self._note_terms[key] = counts
+        for term, count in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[key] = count
+
+    def remove(self, note_type: str, item_id: str) -> None:
+        """Drop a note from the index."""
+        self.update(note_type, item_id, "")
+
+    def search(
+        self,
+        query: str,
+        note_types: Iterable[str] | None = None,
+        limit: int = 20,
+        prefix: bool = True,
+    ) -> list[tuple[NoteKey, float]]:
+        """Return the best matching notes and their scores, best first."""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+
+        total = len(self._note_terms)
+        word_scores = []
+        for word in words:
+            scores: dict[NoteKey, float] = {}
+            for term, weight in self._matching_terms(word, prefix):
+                postings = self._postings[term]
+                idf = math.log(1 + total / len(postings))
+                for key, count in postings.items():
+                    score = weight * count * idf
+                    if score > scores.get(key, 0.0):
+                        scores[key] = score
+            if not scores:
+                return []
+            word_scores.append(scores)
+
+        # Intersect starting from the rarest word to keep the candidate set small
+        word_scores.sort(key=len)
+        candidates = word_scores[0].keys()
+        for scores in word_scores[1:]:
+            candidates = candidates & scores.keys()
+        if note_types is not None:
+            allowed = set(note_types)
+            candidates = [key for key in candidates if key[0] in allowed]
+
+        ranked = [(key, sum(scores[key] for scores in word_scores)) for key in candidates]
+        ranked.sort(key=lambda result: (-result[1], result[0]))
+        return ranked[:limit]
+
+    def _matching_terms(self, word: str, prefix: bool) -> Iterable[tuple[str, float]]:
+        """Yield the indexed terms matching a query word and their weights."""
+        if not prefix:
+            if word in self._postings:
+                yield word, 1.0
+            return
+
+        index = bisect_left(self._terms, word)
+        while index < len(self._terms) and self._terms[index].startswith(word):
+            term = self._terms[index]
+            yield term, 1.0 if term == word else PREFIX_MATCH_WEIGHT
+            index += 1
+
+
+class NoteQueryIndex:
+    """Sorted secondary indexes over note ids and update times.
+
+    Each note type keeps its ids in sorted order, so prefix and domain
+    queries are a binary search, and its (updated_at, id) pairs in time
+    order, so time range queries are too. Notes saved before update times
+    were recorded have no updated_at and are only in the id index.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty indexes."""
+        self._ids: dict[str, list[str]] = {}
+        self._by_time: dict[str, list[tuple[int, str]]] = {}
+        self._updated_at: dict[NoteKey, int | None] = {}
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return the size of the indexes."""
+        return {
+            "notes": len(self._updated_at),
+            "timed_notes": sum(len(by_time) for by_time in self._by_time.values()),
+        }
+
+    def rebuild(self, notes: Iterable[tuple[str, str, int | None]]) -> None:
+        """Replace the indexes with (note_type, item_id, updated_at) entries."""
+        self._ids.clear()
+        self._by_time.clear()
+        self._updated_at.clear()
+        for note_type, item_id, updated_at in notes:
+            self._updated_at[(note_type, item_id)] = updated_at
+            self._ids.setdefault(note_type, []).append(item_id)
+            if updated_at is not None:
+                self._by_time.setdefault(note_type, []).append((updated_at, item_id))
+        for ids in self._ids.values():
+            ids.sort()
+        for by_time in self._by_time.values():
+            by_time.sort()
+
+    def update(self, note_type: str, item_id: str, exists: bool, updated_at: int | None = None) -> None:
+        """Index the current state of a note; ``exists`` is False once it is deleted."""
+        key = (note_type, item_id)
+        ids = self._ids.setdefault(note_type, [])
+        by_time = self._by_time.setdefault(note_type, [])
+
+        old_updated_at = self._updated_at.pop(key, _MISSING)
+        if old_updated_at is not _MISSING:
+            if old_updated_at is not None:
+                del by_time[bisect_left(by_time, (old_updated_at, item_id))]
+            if not exists:
+                del ids[bisect_left(ids, item_id)]
+        if not exists:
+            return
+
+        if old_updated_at is _MISSING:
+            insort(ids, item_id)
+        self._updated_at[key] = updated_at
+        if updated_at is not None:
+            insort(by_time, (updated_at, item_id))
+
+    def query(
+        self,
+        note_type: str,
+        prefix: str = "",
+        updated_since: int | None = None,
+        updated_before: int | None = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[str], int]:
+        """Return one page of matching ids and the total number of matches.
+
+        Without a time range the ids are in id order. With one, only notes
+        updated at or after ``updated_since`` and before ``updated_before`` match,
+        newest first.
+        """
+        if updated_since is None and updated_before is None:
+            ids = self._ids.get(note_type, [])
+            start = bisect_left(ids, prefix)
+            end = bisect_left(ids, prefix + MAX_CHAR) if prefix else len(ids)
+            return ids[start + offset:max(start + offset, min(end, start + offset + limit))], end - start
+
+        by_time = self._by_time.get(note_type, [])
+        start = bisect_left(by_time, (updated_since,)) if updated_since is not None else 0
+        end = bisect_left(by_time, (updated_before,)) if updated_before is not None else len(by_time)
+        matches = [
+            item_id
+            for _updated_at, item_id in reversed(by_time[start:end])
+            if item_id.startswith(prefix)
+        ]
+        return matches[offset:offset + limit], len(matches)
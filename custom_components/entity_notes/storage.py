@@ -0,0 +1,582 @@
+"""Persistence for Entity Notes."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Callable, Iterable
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    STORAGE_BACKEND_JOURNAL,
+    STORAGE_BACKEND_SHARDED,
+    JOURNAL_MAX_BYTES,
+    V1_BACKUP_FILE,
+)
+from .records import CompressedNoteRecord, NoteRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+# (note_type, item_id) pairs describing which notes changed
+NoteChanges = Iterable[tuple[str, str]]
+
+
+def _journal_path(hass: HomeAssistant) -> str:
+    """Return the path of the note journal next to the store file."""
+    return hass.config.path(".storage", f"{STORAGE_KEY}.journal")
+
+
+def _read_journal(path: str) -> tuple[list[dict[str, Any]], int]:
+    """Read journal records and the journal size. Runs in the executor."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return [], 0
+
+    records = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # A torn final line is expected if HA stopped mid-append
+            _LOGGER.warning("Skipping unreadable journal record on line %d of %s", line_number, path)
+    return records, sum(len(line.encode("utf-8")) for line in lines)
+
+
+def _shard_store(hass: HomeAssistant, shard: str) -> Store:
+    """Return the Store holding one shard of notes."""
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{shard}")
+
+
+def _manifest_store(hass: HomeAssistant) -> Store:
+    """Return the Store listing the shards written by the sharded backend."""
+    return Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.shards")
+
+
+def _note_shard(note_type: str, item_id: str) -> str:
+    """Return the shard a note belongs to: one per entity domain, one for devices."""
+    if note_type != "entity":
+        return note_type
+    domain = item_id.split(".", 1)[0]
+    if not re.fullmatch(r"[a-z0-9_]+", domain):
+        return "entity._other"
+    return f"entity.{domain}"
+
+
+async def _async_load_shards(hass: HomeAssistant) -> tuple[list[str], dict[str, Any]] | None:
+    """Load all shards in parallel, or return None if the sharded backend was never used."""
+    manifest = await _manifest_store(hass).async_load()
+    if manifest is None:
+        return None
+
+    shards = manifest.get("shards", [])
+    results = await asyncio.gather(*(_shard_store(hass, shard).async_load() for shard in shards))
+    data: dict[str, Any] = {"entity_notes": {}, "device_notes": {}}
+    for shard_data in results:
+        for key, notes in (shard_data or {}).items():
+            data.setdefault(key, {}).update(notes)
+    return shards, data
+
+
+async def _async_remove_shards(hass: HomeAssistant, shards: list[str]) -> None:
+    """Remove shard files and the manifest after moving notes back into one file."""
+    await asyncio.gather(*(_shard_store(hass, shard).async_remove() for shard in shards))
+    await _manifest_store(hass).async_remove()
+
+
+def _apply_journal(data: dict[str, Any], records: list[dict[str, Any]]) -> tuple[int, int]:
+    """Replay journal records newer than the snapshot onto the notes data.
+
+    Returns the number of records applied and the highest sequence number seen.
+    """
+    last_seq = data.get("journal_seq", 0)
+    applied = 0
+    for record in records:
+        seq = record.get("seq", 0)
+        if seq <= data.get("journal_seq", 0):
+            continue
+        notes = data.setdefault(f"{record['type']}_notes", {})
+        if record.get("deleted"):
+            notes.pop(record["id"], None)
+        elif "ztext" in record:
+            notes[record["id"]] = {"ztext": record["ztext"], "updated_at": record.get("updated_at")}
+        else:
+            notes[record["id"]] = {
+                "text": record.get("text", ""),
+                "updated_at": record.get("updated_at"),
+            }
+        applied += 1
+        last_seq = max(last_seq, seq)
+    return applied, last_seq
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Write JSON to a file. Runs in the executor."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+
+class _NotesFile(Store):
+    """The single notes file, migrating older storage versions on load.
+
+    Home Assistant's Store reads and parses the file once and hands older
+    versions to ``_async_migrate_func``, so the version check needs no extra
+    read of its own. The Store also writes the migrated data back itself.
+    """
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Any
+    ) -> dict[str, Any]:
+        """Migrate version 1 data, which held entity notes only."""
+        if old_major_version != 1:
+            return old_data
+
+        start = time.perf_counter()
+        _LOGGER.warning("Migrating %d entity notes from storage version 1 to %d", len(old_data), self.version)
+        backup_path = self.hass.config.path(".storage", V1_BACKUP_FILE)
+        try:
+            await self.hass.async_add_executor_job(
+                _write_json, backup_path, {"version": 1, "key": self.key, "data": old_data}
+            )
+            _LOGGER.warning("Created backup at: %s", backup_path)
+        except OSError as e:
+            _LOGGER.error("Failed to create backup: %s", e)
+
+        _LOGGER.warning(
+            "Migrated %d entity notes to storage version %d in %.1f ms",
+            len(old_data),
+            self.version,
+            (time.perf_counter() - start) * 1000,
+        )
+        return {"entity_notes": dict(old_data), "device_notes": {}}
+
+
+class NotesStore:
+    """Write-behind persistence for entity and device notes.
+
+    Every change marks the store dirty. The first change schedules a write
+    ``save_delay`` seconds later and all changes made within that window are
+    coalesced into the single write. Home Assistant's final write on shutdown
+    flushes anything still pending.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        data_func: Callable[[], dict[str, Any]],
+        note_func: Callable[[str, str], NoteRecord | CompressedNoteRecord | None],
+        save_delay: int,
+    ) -> None:
+        """Initialize the notes store."""
+        self.hass = hass
+        self._store = _NotesFile(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data_func = data_func
+        self._note_func = note_func
+        self._save_delay = save_delay
+        self._pending = 0
+        self.stats = {
+            "save_requests": 0,
+            "writes": 0,
+            "coalesced": 0,
+        }
+
+    @property
+    def dirty(self) -> bool:
+        """Return True if there are changes that have not been written yet."""
+        return self._pending > 0
+
+    async def _async_load_snapshot(self) -> dict[str, Any] | None:
+        """Load the single-file snapshot, taking over notes left in shards."""
+        sharded = await _async_load_shards(self.hass)
+        if sharded is None:
+            return await self._store.async_load()
+
+        shards, data = sharded
+        _LOGGER.info("Moving notes from %d shards back into the notes store", len(shards))
+        await self._store.async_save(data)
+        await _async_remove_shards(self.hass, shards)
+        return data
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load the stored notes, folding in any journal left by the journal backend."""
+        data = await self._async_load_snapshot()
+        records, _size = await self.hass.async_add_executor_job(_read_journal, _journal_path(self.hass))
+        if not records:
+            return data
+
+        data = data or {}
+        applied, _last_seq = _apply_journal(data, records)
+        _LOGGER.info("Folding %d journal records into the notes store", applied)
+        data.pop("journal_seq", None)
+        await self._store.async_save(data)
+        await self.hass.async_add_executor_job(os.remove, _journal_path(self.hass))
+        return data
+
+    @callback
+    def _async_write_data(self) -> dict[str, Any]:
+        """Return the data to write and reset the dirty state."""
+        self.stats["writes"] += 1
+        self.stats["coalesced"] += max(self._pending - 1, 0)
+        self._pending = 0
+        return self._data_func()
+
+    async def async_save(self, changes: NoteChanges | None = None) -> None:
+        """Mark the notes dirty and schedule a write."""
+        self.stats["save_requests"] += 1
+        self._pending += 1
+
+        if self._save_delay <= 0:
+            await self._store.async_save(self._async_write_data())
+            return
+
+        # Only the first change in a window schedules the write; the data is
+        # collected when the write happens, so later changes ride along.
+        if self._pending == 1:
+            self._store.async_delay_save(self._async_write_data, self._save_delay)
+
+    async def async_flush(self) -> None:
+        """Write pending changes immediately."""
+        if not self._pending:
+            return
+        pending = self._pending
+        await self._store.async_save(self._async_write_data())
+        _LOGGER.debug("Flushed %d pending note changes", pending)
+
+    async def async_close(self) -> None:
+        """Flush pending changes before the integration unloads."""
+        await self.async_flush()
+
+
+class JournalNotesStore(NotesStore):
+    """Append-only journal on top of a periodically compacted snapshot.
+
+    Each change appends one small record to the journal file, so the cost of a
+    write depends on the change rather than on the number of notes. Once the
+    journal grows past ``JOURNAL_MAX_BYTES`` it is compacted into the snapshot.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        data_func: Callable[[], dict[str, Any]],
+        note_func: Callable[[str, str], NoteRecord | CompressedNoteRecord | None],
+        save_delay: int,
+    ) -> None:
+        """Initialize the journal store."""
+        super().__init__(hass, data_func, note_func, save_delay)
+        self._path = _journal_path(hass)
+        self._seq = 0
+        self._journal_size = 0
+        self._queue: list[dict[str, Any]] = []
+        self._drain_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._unsub_final_write: Callable[[], None] | None = None
+        self.stats.update({
+            "journal_records": 0,
+            "journal_bytes": 0,
+            "compactions": 0,
+        })
+
+    @property
+    def dirty(self) -> bool:
+        """Return True if there are records that have not been appended yet."""
+        return bool(self._queue)
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load the snapshot and replay the journal on top of it."""
+        data = await self._async_load_snapshot()
+        records, self._journal_size = await self.hass.async_add_executor_job(_read_journal, self._path)
+        self._seq = data.get("journal_seq", 0) if data else 0
+
+        if records:
+            data = data or {}
+            applied, self._seq = _apply_journal(data, records)
+            _LOGGER.debug("Replayed %d journal records (sequence %d)", applied, self._seq)
+
+        self.stats["journal_bytes"] = self._journal_size
+        self._unsub_final_write = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+        )
+        return data
+
+    @callback
+    def _async_write_data(self) -> dict[str, Any]:
+        """Return the snapshot, stamped with the last journal record it covers."""
+        data = super()._async_write_data()
+        data["journal_seq"] = self._seq
+        return data
+
+    def _journal_record(self, note_type: str, item_id: str) -> dict[str, Any]:
+        """Build a journal record for the current state of a note."""
+        self._seq += 1
+        record = {"seq": self._seq, "type": note_type, "id": item_id}
+        note = self._note_func(note_type, item_id)
+        if note is None:
+            record["deleted"] = True
+        else:
+            # Compressed notes stay compressed in the journal
+            record.update(note.as_dict())
+        return record
+
+    async def async_save(self, changes: NoteChanges | None = None) -> None:
+        """Append records for the changed notes, or compact if the change is unknown."""
+        self.stats["save_requests"] += 1
+        if changes is None:
+            await self._async_compact()
+            return
+
+        self._queue.extend(self._journal_record(note_type, item_id) for note_type, item_id in changes)
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = self.hass.async_create_background_task(
+                self._async_drain(), "entity_notes journal append"
+            )
+
+    def _append(self, lines: str) -> int:
+        """Append lines to the journal and return its new size. Runs in the executor."""
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def _truncate(self) -> None:
+        """Empty the journal. Runs in the executor."""
+        with open(self._path, "w", encoding="utf-8"):
+            pass
+
+    async def _async_drain(self) -> None:
+        """Append queued records in batches until the queue is empty."""
+        while self._queue:
+            async with self._lock:
+                records, self._queue = self._queue, []
+                if not records:
+                    continue
+                lines = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+                try:
+                    self._journal_size = await self.hass.async_add_executor_job(self._append, lines)
+                except OSError as e:
+                    _LOGGER.error("Failed to append to note journal, writing a full snapshot instead: %s", e)
+                    self._journal_size = JOURNAL_MAX_BYTES + 1
+                else:
+                    self.stats["journal_records"] += len(records)
+                    self.stats["journal_bytes"] = self._journal_size
+
+            if self._journal_size > JOURNAL_MAX_BYTES:
+                await self._async_compact()
+
+    async def _async_compact(self) -> None:
+        """Write a full snapshot and start a new journal."""
+        async with self._lock:
+            # Queued records are already reflected in the in-memory notes
+            self._queue.clear()
+            await self._store.async_save(self._async_write_data())
+            await self.hass.async_add_executor_job(self._truncate)
+            self._journal_size = 0
+            self.stats["journal_bytes"] = 0
+            self.stats["compactions"] += 1
+        _LOGGER.debug("Compacted note journal at sequence %d", self._seq)
+
+    async def async_flush(self) -> None:
+        """Append any queued journal records."""
+        if self._drain_task is not None and not self._drain_task.done():
+            await self._drain_task
+        if self._queue:
+            await self._async_drain()
+
+    async def _async_final_write(self, _event) -> None:
+        """Flush the journal when Home Assistant shuts down."""
+        self._unsub_final_write = None
+        await self.async_flush()
+
+    async def async_close(self) -> None:
+        """Flush the journal and stop listening for shutdown."""
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        await self.async_flush()
+
+
+class ShardedNotesStore(NotesStore):
+    """Notes split across one Store file per entity domain plus one for devices.
+
+    A change only rewrites the shard it belongs to. Each shard is written
+    behind the save delay through its own ``Store.async_delay_save``.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        data_func: Callable[[], dict[str, Any]],
+        note_func: Callable[[str, str], NoteRecord | CompressedNoteRecord | None],
+        save_delay: int,
+    ) -> None:
+        """Initialize the sharded store."""
+        super().__init__(hass, data_func, note_func, save_delay)
+        self._manifest = _manifest_store(hass)
+        self._shards: dict[str, Store] = {}
+        self._members: dict[str, tuple[str, set[str]]] = {}
+        self._dirty: set[str] = set()
+        self.stats["shards"] = 0
+
+    @property
+    def dirty(self) -> bool:
+        """Return True if any shard has changes that have not been written yet."""
+        return bool(self._dirty)
+
+    def _index(self, data: dict[str, Any]) -> None:
+        """Rebuild which note ids live in which shard."""
+        self._members = {}
+        for note_type in ("entity", "device"):
+            for item_id in data.get(f"{note_type}_notes", {}):
+                self._add_member(note_type, item_id)
+
+    def _add_member(self, note_type: str, item_id: str) -> str:
+        """Record that a note lives in its shard and return the shard name."""
+        shard = _note_shard(note_type, item_id)
+        self._members.setdefault(shard, (note_type, set()))[1].add(item_id)
+        return shard
+
+    def _shard(self, shard: str) -> Store:
+        """Return the Store for a shard, creating it on first use."""
+        if shard not in self._shards:
+            self._shards[shard] = _shard_store(self.hass, shard)
+        return self._shards[shard]
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load all shards in parallel, migrating from the single file on first use."""
+        sharded = await _async_load_shards(self.hass)
+        if sharded is not None:
+            _shards, data = sharded
+            self._index(data)
+            self.stats["shards"] = len(self._members)
+            return data
+
+        data = await super().async_load()
+        if not data:
+            return data
+
+        entity_count = len(data.get("entity_notes", {}))
+        device_count = len(data.get("device_notes", {}))
+        self._index(data)
+        # The notes are not in hass.data yet, so the shards are built from the
+        # loaded data rather than through note_func
+        shard_data = {shard: self._loaded_shard_data(shard, data) for shard in self._members}
+        await asyncio.gather(*(self._shard(shard).async_save(notes) for shard, notes in shard_data.items()))
+        self.stats["writes"] += len(shard_data)
+
+        # Only switch to the shards once they are known to hold every note; the
+        # manifest is what makes the next start read them instead of the file
+        written: dict[str, Any] = {"entity_notes": {}, "device_notes": {}}
+        for notes in await asyncio.gather(*(self._shard(shard).async_load() for shard in shard_data)):
+            for key, shard_notes in (notes or {}).items():
+                written.setdefault(key, {}).update(shard_notes)
+        if any(written[key] != data.get(key, {}) for key in ("entity_notes", "device_notes")):
+            raise HomeAssistantError(
+                f"Storage shards do not match .storage/{STORAGE_KEY}; keeping the single notes file"
+            )
+        await self._async_save_manifest()
+        _LOGGER.warning(
+            "Migrated %d entity notes and %d device notes into %d storage shards; "
+            ".storage/%s is kept as a backup",
+            entity_count,
+            device_count,
+            len(self._members),
+            STORAGE_KEY,
+        )
+        return data
+
+    def _loaded_shard_data(self, shard: str, data: dict[str, Any]) -> dict[str, Any]:
+        """Return the notes of a shard from freshly loaded data, in their stored form."""
+        note_type, members = self._members[shard]
+        notes = data.get(f"{note_type}_notes", {})
+        return {f"{note_type}_notes": {item_id: notes[item_id] for item_id in members}}
+
+    def _shard_data(self, shard: str) -> dict[str, Any]:
+        """Return the notes belonging to a shard."""
+        note_type, members = self._members.get(shard, (None, set()))
+        if note_type is None:
+            return {}
+        notes = {}
+        for item_id in list(members):
+            note = self._note_func(note_type, item_id)
+            if note is None:
+                members.discard(item_id)
+            else:
+                notes[item_id] = note
+        return {f"{note_type}_notes": notes}
+
+    @callback
+    def _async_write_shard_data(self, shard: str) -> dict[str, Any]:
+        """Return a shard's data for a delayed write and mark it clean."""
+        self.stats["writes"] += 1
+        self._dirty.discard(shard)
+        return self._shard_data(shard)
+
+    async def _async_write_shard(self, shard: str) -> None:
+        """Write one shard immediately."""
+        await self._shard(shard).async_save(self._async_write_shard_data(shard))
+
+    async def _async_save_manifest(self) -> None:
+        """Record the current list of shards."""
+        self.stats["shards"] = len(self._members)
+        await self._manifest.async_save({"shards": sorted(self._members)})
+
+    async def async_save(self, changes: NoteChanges | None = None) -> None:
+        """Rewrite only the shards touched by the changes."""
+        self.stats["save_requests"] += 1
+        known_shards = set(self._members)
+
+        if changes is None:
+            self._index(self._data_func())
+            touched = set(self._members) | known_shards
+        else:
+            touched = {self._add_member(note_type, item_id) for note_type, item_id in changes}
+
+        if set(self._members) - known_shards:
+            await self._async_save_manifest()
+
+        for shard in touched:
+            if self._save_delay <= 0:
+                await self._async_write_shard(shard)
+            elif shard in self._dirty:
+                self.stats["coalesced"] += 1
+            else:
+                self._dirty.add(shard)
+                self._shard(shard).async_delay_save(
+                    lambda shard=shard: self._async_write_shard_data(shard),
+                    self._save_delay,
+                )
+
+    async def async_flush(self) -> None:
+        """Write every dirty shard immediately."""
+        dirty = list(self._dirty)
+        await asyncio.gather(*(self._async_write_shard(shard) for shard in dirty))
+        if dirty:
+            _LOGGER.debug("Flushed %d dirty note shards", len(dirty))
+
+
+def create_notes_store(
+    hass: HomeAssistant,
+    backend: str,
+    data_func: Callable[[], dict[str, Any]],
+    note_func: Callable[[str, str], NoteRecord | CompressedNoteRecord | None],
+    save_delay: int,
+) -> NotesStore:
+    """Create the notes store for the configured storage backend."""
+    if backend == STORAGE_BACKEND_JOURNAL:
+        return JournalNotesStore(hass, data_func, note_func, save_delay)
+    if backend == STORAGE_BACKEND_SHARDED:
+        return ShardedNotesStore(hass, data_func, note_func, save_delay)
+    return NotesStore(hass, data_func, note_func, save_delay)
@@ -0,0 +1,164 @@
+"""Websocket API for Entity Notes."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from . import (
+    NOTE_TARGETS,
+    _async_note_change_payload,
+    _async_note_payload,
+    _async_notes_ready,
+    _note_target,
+)
+from .const import (
+    BATCH_MAX_IDS,
+    CONF_ENABLE_DEVICE_NOTES,
+    DOMAIN,
+    SIGNAL_NOTE_CHANGED,
+    SIGNAL_NOTES_RELOADED,
+)
+
+# Optional id lists shared by the commands, e.g. entity_ids and device_ids
+ID_LISTS_SCHEMA = {
+    vol.Optional(f"{target['id_field']}s"): vol.All(
+        [target["id_validator"]], vol.Length(max=BATCH_MAX_IDS)
+    )
+    for target in NOTE_TARGETS.values()
+}
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the Entity Notes websocket commands."""
+    websocket_api.async_register_command(hass, websocket_get_many)
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+def _note_types(hass: HomeAssistant) -> list[str]:
+    """Return the enabled note types."""
+    return [
+        note_type
+        for note_type in NOTE_TARGETS
+        if note_type != "device" or hass.data[DOMAIN]["config"][CONF_ENABLE_DEVICE_NOTES]
+    ]
+
+
+def _requested_ids(hass: HomeAssistant, msg: dict[str, Any]) -> dict[str, list[str] | None]:
+    """Return the ids requested per enabled note type; None means all of them."""
+    return {
+        note_type: msg.get(f"{_note_target(note_type)['id_field']}s")
+        for note_type in _note_types(hass)
+    }
+
+
+def _user_name(connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> str | None:
+    """Return the name to render notes for, or None when rendering is off."""
+    if not msg["render"]:
+        return None
+    return connection.user.name if connection.user else "User"
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_notes/get_many",
+        **ID_LISTS_SCHEMA,
+        vol.Optional("render", default=True): bool,
+    }
+)
+@websocket_api.async_response
+async def websocket_get_many(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return many notes in one message."""
+    if DOMAIN not in hass.data:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Entity Notes is not loaded")
+        return
+    if not await _async_notes_ready(hass):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_HOME_ASSISTANT_ERROR, "Entity Notes could not load its notes"
+        )
+        return
+
+    user_name = _user_name(connection, msg)
+    result = {}
+    for note_type, item_ids in _requested_ids(hass, msg).items():
+        result[_note_target(note_type)["store_key"]] = {
+            item_id: await _async_note_payload(hass, note_type, item_id, user_name)
+            for item_id in dict.fromkeys(item_ids or [])
+        }
+    connection.send_result(msg["id"], result)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "entity_notes/subscribe",
+        **ID_LISTS_SCHEMA,
+        vol.Optional("render", default=True): bool,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Push note changes for the requested ids, or for all notes if none are given.
+
+    Each change is sent as ``{"entity_notes": {id: note}}`` (or
+    ``device_notes``), with ``deleted`` set for removed notes. A ``reset``
+    message means the notes were replaced in bulk and should be read again.
+    """
+    if DOMAIN not in hass.data:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Entity Notes is not loaded")
+        return
+
+    user_name = _user_name(connection, msg)
+    requested = _requested_ids(hass, msg)
+    # Without any id lists the subscriber follows every note (None)
+    follow_all = all(item_ids is None for item_ids in requested.values())
+    watched = {
+        note_type: None if follow_all else set(item_ids or [])
+        for note_type, item_ids in requested.items()
+    }
+
+    async def send_change(note_type: str, item_id: str) -> None:
+        """Send the current state of a changed note."""
+        payload = await _async_note_change_payload(hass, note_type, item_id, user_name)
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"], {_note_target(note_type)["store_key"]: {item_id: payload}}
+            )
+        )
+
+    @callback
+    def forward_change(note_type: str, item_id: str) -> None:
+        """Forward a note change if the subscriber watches it."""
+        if note_type not in watched:
+            return
+        item_ids = watched[note_type]
+        if item_ids is not None and item_id not in item_ids:
+            return
+        hass.async_create_task(send_change(note_type, item_id), eager_start=True)
+
+    @callback
+    def forward_reset() -> None:
+        """Tell the subscriber to read its notes again."""
+        connection.send_message(websocket_api.event_message(msg["id"], {"reset": True}))
+
+    unsubs = [
+        async_dispatcher_connect(hass, SIGNAL_NOTE_CHANGED, forward_change),
+        async_dispatcher_connect(hass, SIGNAL_NOTES_RELOADED, forward_reset),
+    ]
+
+    @callback
+    def unsubscribe() -> None:
+        """Stop forwarding changes."""
+        while unsubs:
+            unsubs.pop()()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
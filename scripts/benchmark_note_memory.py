@@ -0,0 +1,94 @@
+"""Compare the memory used by notes held as dicts, as NoteRecords and compressed.
+
+Runs without Home Assistant:
+
+    python scripts/benchmark_note_memory.py [note_count] [note_length]
+"""
+from __future__ import annotations
+
+import importlib
+import json
+from pathlib import Path
+import sys
+import types
+from typing import Any
+
+PACKAGE_PATH = Path(__file__).parent.parent / "custom_components" / "entity_notes"
+
+
+def _load_records_module():
+    """Import records.py without running the integration's __init__, which needs Home Assistant."""
+    package = types.ModuleType("entity_notes")
+    package.__path__ = [str(PACKAGE_PATH)]
+    sys.modules["entity_notes"] = package
+    return importlib.import_module("entity_notes.records")
+
+
+def _stored_notes(count: int, length: int) -> str:
+    """Return a notes file body like .storage/entity_notes.notes, one in ten notes a legacy string."""
+    notes = {}
+    for index in range(count):
+        lines = []
+        while sum(len(line) for line in lines) < length:
+            step = len(lines) + index
+            lines.append(f"{step % 9 + 1}. Replaced the battery on {step % 28 + 1} March, check again in spring.\n")
+        text = "".join(lines)[:length]
+        if index % 10:
+            notes[f"sensor.room_{index}_temperature"] = {"text": text, "updated_at": 1_700_000_000 + index}
+        else:
+            notes[f"sensor.room_{index}_temperature"] = text
+    return json.dumps({"entity_notes": notes, "device_notes": {}})
+
+
+def _deep_size(notes: dict[str, Any]) -> int:
+    """Return the bytes held by a notes dict and every object it references, each counted once."""
+    seen = set()
+    size = 0
+    pending = [notes]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif hasattr(obj, "__slots__"):
+            pending.extend(getattr(obj, slot) for slot in obj.__slots__)
+    return size
+
+
+def main() -> None:
+    """Load the same notes file both ways and print the memory each layout keeps."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    records = _load_records_module()
+    body = _stored_notes(count, length)
+
+    # The previous layout kept the notes exactly as they were stored
+    stored = json.loads(body)["entity_notes"]
+    notes = records.load_notes(json.loads(body)["entity_notes"])
+    # Records are written back in the stored form of current notes
+    assert records.dump_notes(notes) == {
+        item_id: records.load_note(raw_note).as_dict() for item_id, raw_note in stored.items()
+    }
+    compressed = records.load_notes(json.loads(body)["entity_notes"], compress=True)
+    assert {item_id: record.text for item_id, record in compressed.items()} == {
+        item_id: records.load_note(raw_note).text for item_id, raw_note in stored.items()
+    }
+
+    dict_bytes = _deep_size(stored)
+    record_bytes = _deep_size(notes)
+    compressed_bytes = _deep_size(compressed)
+
+    print(f"{count} notes of {length} characters")
+    print(f"  dicts:   {dict_bytes / 1024 / 1024:8.1f} MiB  {dict_bytes / count:6.0f} B/note")
+    print(f"  records: {record_bytes / 1024 / 1024:8.1f} MiB  {record_bytes / count:6.0f} B/note")
+    print(f"  saved:   {(dict_bytes - record_bytes) / 1024 / 1024:8.1f} MiB  ({1 - record_bytes / dict_bytes:.0%})")
+    print(f"  compressed records (notes of {records.COMPRESS_MIN_LENGTH}+ characters):")
+    print(f"           {compressed_bytes / 1024 / 1024:8.1f} MiB  {compressed_bytes / count:6.0f} B/note")
+
+
+if __name__ == "__main__":
+    main()